@@ -0,0 +1,4 @@
+from .generators import FakeEmbeddingModel, make_labels, make_rss_xml, make_titles
+from .stub_server import StubServer
+
+__all__ = ["FakeEmbeddingModel", "StubServer", "make_labels", "make_rss_xml", "make_titles"]
@@ -0,0 +1,126 @@
+import hashlib
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Sequence
+from xml.sax.saxutils import escape
+
+SYLLABLES = (
+    "ka", "lo", "mi", "ra", "ven", "tor", "sa", "li", "na", "dre", "zo", "bel", "qui", "mar",
+    "ton", "el", "ro", "sy", "lux", "fen", "da", "ri", "mo", "jun", "pa", "vi", "cor", "ne",
+)
+WORDS = (
+    "love", "night", "fire", "city", "dream", "echo", "gold", "river", "heart", "storm", "blue",
+    "summer", "ghost", "light", "midnight", "wild", "silver", "rain", "paper", "moon",
+)
+HEADLINE_TEMPLATES = (
+    "{artist} announces world tour after surprise release of {work}",
+    "Review: {artist} returns with '{recording}'",
+    "{artist} and {other} top the charts this week",
+    "Streaming numbers for {recording} surge as {artist} performs live",
+    "Label signs {artist}; debut single {recording} due next month",
+    "Festival lineup revealed with {artist}, {other} headlining",
+    "Inside the making of {work}, the record that defined {artist}",
+)
+FILLER_HEADLINES = (
+    "Industry groups debate new streaming royalty rates",
+    "Vinyl sales continue to climb for the fifth straight year",
+    "Concert ticket prices draw scrutiny from regulators",
+)
+
+
+def _name(rng: random.Random, parts: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(parts)).capitalize()
+
+
+def make_labels(count: int, seed: int = 7, kind: str = "artist") -> List[str]:
+    """Deterministic, mostly-unique synthetic dictionary labels."""
+    rng = random.Random(f"{seed}:{kind}")
+    labels: List[str] = []
+    for index in range(count):
+        if kind == "artist":
+            label = f"{_name(rng, rng.randint(2, 3))} {_name(rng, rng.randint(2, 4))}"
+        else:
+            label = " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 3)))
+        # Suffix keeps large dictionaries unique without changing the label shape much.
+        if index >= len(SYLLABLES) ** 3:
+            label = f"{label} {index}"
+        labels.append(label)
+    return labels
+
+
+def make_titles(
+    count: int,
+    artists: Sequence[str],
+    works: Sequence[str],
+    recordings: Sequence[str],
+    seed: int = 11,
+    hit_rate: float = 0.8
+) -> List[str]:
+    rng = random.Random(seed)
+    titles: List[str] = []
+    for _ in range(count):
+        if not artists or rng.random() > hit_rate:
+            titles.append(rng.choice(FILLER_HEADLINES))
+            continue
+        template = rng.choice(HEADLINE_TEMPLATES)
+        titles.append(
+            template.format(
+                artist=rng.choice(artists),
+                other=rng.choice(artists),
+                work=rng.choice(works) if works else rng.choice(WORDS),
+                recording=rng.choice(recordings) if recordings else rng.choice(WORDS),
+            )
+        )
+    return titles
+
+
+def make_rss_xml(feed_name: str, titles: Sequence[str], base_url: str = "https://news.example.com") -> str:
+    published = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    items: List[str] = []
+    for index, title in enumerate(titles):
+        slug = hashlib.sha1(f"{feed_name}:{index}:{title}".encode("utf-8")).hexdigest()[:16]
+        stamp = (published + timedelta(minutes=index)).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        items.append(
+            "<item>"
+            f"<title>{escape(title)}</title>"
+            f"<link>{base_url}/{feed_name}/{slug}</link>"
+            f"<description>{escape(title)} — full coverage inside.</description>"
+            f"<pubDate>{stamp}</pubDate>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel>'
+        f"<title>{escape(feed_name)}</title><link>{base_url}/{feed_name}</link>"
+        f"<description>Synthetic feed {escape(feed_name)}</description>"
+        + "".join(items)
+        + "</channel></rss>"
+    )
+
+
+class FakeVector(list):
+    def tolist(self) -> List[float]:
+        return list(self)
+
+
+class FakeEmbeddingModel:
+    """Deterministic stand-in for `SentenceTransformer` with a fixed per-call cost profile.
+
+    Vectors are derived from hashed character trigrams so similar strings land close together.
+    """
+
+    def __init__(self, dimensions: int = 384) -> None:
+        self.dimensions = dimensions
+
+    def encode(self, texts: Sequence[str]) -> List[FakeVector]:
+        vectors: List[FakeVector] = []
+        for text in texts:
+            vector = [0.0] * self.dimensions
+            padded = f"  {text.lower()}  "
+            for index in range(len(padded) - 2):
+                digest = hashlib.blake2b(padded[index : index + 3].encode("utf-8"), digest_size=4).digest()
+                vector[int.from_bytes(digest, "little") % self.dimensions] += 1.0
+            norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+            vectors.append(FakeVector(value / norm for value in vector))
+        return vectors
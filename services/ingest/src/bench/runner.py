@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ..tagging import CompiledDictionary, EmbeddingClient, TaggingConfig, compile_dictionary, match_entities
+from ..tagging.matcher import _prepare_candidates
+from .generators import FakeEmbeddingModel, make_labels, make_rss_xml, make_titles
+from .stub_server import StubServer
+
+DEFAULT_SIZES = (1_000,)  # larger dictionaries via `--sizes 1000 10000 100000`
+
+
+@dataclass
+class BenchResult:
+    name: str
+    params: Dict[str, object]
+    samples: List[float]
+    items: int = 1
+    extra: Dict[str, object] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, object]:
+        ordered = sorted(self.samples)
+        mean = statistics.fmean(ordered)
+        return {
+            "name": self.name,
+            "params": self.params,
+            "runs": len(ordered),
+            "items_per_run": self.items,
+            "mean_s": mean,
+            "p50_s": ordered[len(ordered) // 2],
+            "p95_s": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "min_s": ordered[0],
+            "items_per_s": (self.items / mean) if mean else None,
+            **self.extra,
+        }
+
+
+def _timeit(
+    fn: Callable[[], object],
+    repeat: int,
+    warmup: int = 1,
+    setup: Optional[Callable[[], object]] = None
+) -> List[float]:
+    """Time `fn`; `setup` runs untimed before every call, warmups included."""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _dictionary(size: int) -> Dict[str, List[str]]:
+    return {
+        "artists": make_labels(size, kind="artist"),
+        "works": make_labels(max(1, size // 10), kind="work"),
+        "recordings": make_labels(max(1, size // 10), kind="recording"),
+    }
+
+
+def bench_prepare_candidates(sizes: Sequence[int], repeat: int) -> List[BenchResult]:
+    results: List[BenchResult] = []
+    for size in sizes:
+        labels = make_labels(size)
+        samples = _timeit(lambda: _prepare_candidates(labels), repeat=repeat)
+        results.append(BenchResult("prepare_candidates", {"labels": size}, samples, items=size))
+    return results
+
+
+def bench_compiled_dictionary(sizes: Sequence[int], repeat: int) -> List[BenchResult]:
+    results: List[BenchResult] = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            path = os.path.join(workdir, f"dictionary-{size}.bin")
+            dictionary = _dictionary(size)
+            started = time.perf_counter()
+            compile_dictionary(path, **dictionary)
+            build_seconds = time.perf_counter() - started
+            samples = _timeit(lambda: CompiledDictionary(path), repeat=repeat)
+            results.append(
+                BenchResult(
+                    "compiled_dictionary_load",
+                    {"labels": size},
+                    samples,
+                    items=size,
+                    extra={"build_s": build_seconds, "file_bytes": os.path.getsize(path)},
+                )
+            )
+    return results
+
+
+def bench_match_entities(sizes: Sequence[int], titles_per_size: int) -> List[BenchResult]:
+    results: List[BenchResult] = []
+    for size in sizes:
+        dictionary = _dictionary(size)
+        config = TaggingConfig(**dictionary)
+        # Keep total work roughly constant so the 1M-label run finishes in reasonable time.
+        count = max(5, min(titles_per_size, 200_000 // size))
+        titles = make_titles(count, dictionary["artists"], dictionary["works"], dictionary["recordings"])
+        match_entities(titles[0], None, config)
+        samples: List[float] = []
+        matched = 0
+        for title in titles:
+            started = time.perf_counter()
+            result = match_entities(title, None, config)
+            samples.append(time.perf_counter() - started)
+            matched += 1 if result["artist"] else 0
+        results.append(
+            BenchResult(
+                "match_entities",
+                {"labels": size, "titles": count},
+                samples,
+                extra={"artist_hit_rate": round(matched / count, 4)},
+            )
+        )
+    return results
+
+
+def bench_embeddings(texts: int, repeat: int) -> List[BenchResult]:
+    corpus = make_titles(texts, make_labels(500), make_labels(50, kind="work"), make_labels(50, kind="recording"))
+
+    def cold() -> None:
+        client = EmbeddingClient("fake", cache_ttl=0, redis_url=None, model=FakeEmbeddingModel())
+        for text in corpus:
+            client.embed(text)
+
+    warm_client = EmbeddingClient("fake", cache_ttl=0, redis_url=None, model=FakeEmbeddingModel())
+    for text in corpus:
+        warm_client.embed(text)
+
+    def warm() -> None:
+        for text in corpus:
+            warm_client.embed(text)
+
+    return [
+        BenchResult("embedding_client", {"texts": texts, "cache": "cold"}, _timeit(cold, repeat), items=texts),
+        BenchResult("embedding_client", {"texts": texts, "cache": "warm"}, _timeit(warm, repeat), items=texts),
+    ]
+
+
+def _configure_service(stub: StubServer, workdir: str) -> None:
+    from ..config import get_settings
+
+    os.environ["INGEST_GRAPH_API_BASE"] = stub.base_url
+    os.environ["INGEST_DUCKDB_PATH"] = os.path.join(workdir, "bench.duckdb")
+    os.environ.pop("INGEST_CLICKHOUSE_URL", None)
+    get_settings.cache_clear()
+
+
+def bench_ingest_tracks(stub: StubServer, tracks: int, repeat: int) -> List[BenchResult]:
+    from ..config import get_settings
+    from ..main import RawTrack, ingest_tracks
+
+    payload = [
+        RawTrack(isrc=f"USABC24{index:05d}", title=f"Track {index}", artist=f"Artist {index % 97}")
+        for index in range(tracks)
+    ]
+    results: List[BenchResult] = []
+    # "cold" re-pushes every track; "warm" re-sends an unchanged catalog against a populated ledger.
+    for ledger, enabled in (("cold", "false"), ("warm", "true")):
+        os.environ["INGEST_ISRC_LEDGER_ENABLED"] = enabled
+        get_settings.cache_clear()
+        # The warmup run fills the ledger, so its calls stay out of the per-run count.
+        asyncio.run(ingest_tracks(payload))
+        before = stub.graphql_calls
+        samples = _timeit(lambda: asyncio.run(ingest_tracks(payload)), repeat=repeat, warmup=0)
+        calls = (stub.graphql_calls - before) / repeat
+        results.append(
+            BenchResult(
+                "ingest_tracks",
+                {"tracks": tracks, "latency_ms": stub.latency * 1000, "ledger": ledger},
+                samples,
+                items=tracks,
+                extra={"graphql_calls_per_run": calls},
+            )
+        )
+    os.environ.pop("INGEST_ISRC_LEDGER_ENABLED", None)
+    get_settings.cache_clear()
+    return results
+
+
+def bench_ingest_rss(stub: StubServer, feeds: int, items_per_feed: int, labels: int, repeat: int) -> List[BenchResult]:
+    from ..config import get_settings
+    from ..main import RssIngestRequest, ingest_rss
+
+    dictionary = _dictionary(labels)
+    urls = []
+    for index in range(feeds):
+        titles = make_titles(
+            items_per_feed, dictionary["artists"], dictionary["works"], dictionary["recordings"], seed=index
+        )
+        urls.append(stub.add_feed(f"feed{index}", make_rss_xml(f"feed{index}", titles)))
+    request = RssIngestRequest(urls=urls, limit_per_feed=items_per_feed, **dictionary)
+    params = {"feeds": feeds, "items_per_feed": items_per_feed, "labels": labels, "latency_ms": stub.latency * 1000}
+    duckdb_dir = os.path.dirname(os.environ["INGEST_DUCKDB_PATH"])
+    runs = itertools.count()
+
+    def fresh_database() -> None:
+        # First ingest: every run starts from an empty DuckDB file, so nothing is deduplicated.
+        os.environ["INGEST_DUCKDB_PATH"] = os.path.join(duckdb_dir, f"rss-{next(runs)}.duckdb")
+        get_settings.cache_clear()
+
+    first = _timeit(lambda: asyncio.run(ingest_rss(request)), repeat=repeat, setup=fresh_database)
+    # Re-poll: the same feeds against the database the last run filled (unchanged items, dedup hits).
+    repoll = _timeit(lambda: asyncio.run(ingest_rss(request)), repeat=repeat, warmup=0)
+    return [
+        BenchResult("ingest_rss", {**params, "poll": "first"}, first, items=feeds * items_per_feed),
+        BenchResult("ingest_rss", {**params, "poll": "repeat"}, repoll, items=feeds * items_per_feed),
+    ]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    results: List[BenchResult] = []
+    selected = set(args.only or ["prepare", "compiled", "match", "embeddings", "tracks", "rss"])
+    if "prepare" in selected:
+        results += bench_prepare_candidates(args.sizes, args.repeat)
+    if "compiled" in selected:
+        results += bench_compiled_dictionary(args.sizes, args.repeat)
+    if "match" in selected:
+        results += bench_match_entities(args.sizes, args.titles)
+    if "embeddings" in selected:
+        results += bench_embeddings(args.texts, args.repeat)
+    if selected & {"tracks", "rss"}:
+        with tempfile.TemporaryDirectory() as workdir, StubServer(latency=args.latency_ms / 1000) as stub:
+            _configure_service(stub, workdir)
+            if "tracks" in selected:
+                results += bench_ingest_tracks(stub, args.tracks, args.repeat)
+            if "rss" in selected:
+                results += bench_ingest_rss(stub, args.feeds, args.items_per_feed, args.rss_labels, args.repeat)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def _result_key(result: Dict[str, object]) -> str:
+    params = ",".join(f"{key}={value}" for key, value in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def compare(baseline_path: str, candidate_path: str) -> List[str]:
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = {_result_key(item): item for item in json.load(handle)["results"]}
+    with open(candidate_path, encoding="utf-8") as handle:
+        candidate = {_result_key(item): item for item in json.load(handle)["results"]}
+    lines = [f"{'benchmark':<70} {'base mean':>12} {'new mean':>12} {'change':>8}"]
+    for key in sorted(set(baseline) & set(candidate)):
+        before = baseline[key]["mean_s"]
+        after = candidate[key]["mean_s"]
+        change = ((after - before) / before * 100) if before else 0.0
+        lines.append(f"{key:<70} {before:>12.6f} {after:>12.6f} {change:>+7.1f}%")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="ingest-bench", description="Benchmarks for ingest tagging and pipelines")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--only", nargs="*", choices=["prepare", "compiled", "match", "embeddings", "tracks", "rss"])
+    run_parser.add_argument("--sizes", nargs="*", type=int, default=list(DEFAULT_SIZES))
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--titles", type=int, default=200)
+    run_parser.add_argument("--texts", type=int, default=500)
+    run_parser.add_argument("--tracks", type=int, default=200)
+    run_parser.add_argument("--feeds", type=int, default=5)
+    run_parser.add_argument("--items-per-feed", type=int, default=50)
+    run_parser.add_argument("--rss-labels", type=int, default=1_000)
+    run_parser.add_argument("--latency-ms", type=float, default=0.0)
+    run_parser.add_argument("--output", default=None, help="Write JSON results here instead of stdout")
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        print("\n".join(compare(args.baseline, args.candidate)))
+        return
+
+    report = run(args)
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(rendered + "\n")
+    else:
+        print(rendered)
@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class StubServer:
+    """Loopback HTTP server standing in for the Graph API and upstream RSS feeds.
+
+    `POST /graphql` acknowledges every mutation; `GET /feeds/<name>.xml` serves XML registered
+    with `add_feed`. `latency` adds a fixed delay per request to mimic a remote service.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.feeds: Dict[str, bytes] = {}
+        self.graphql_calls = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Stub server is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_feed(self, name: str, xml: str) -> str:
+        self.feeds[name] = xml.encode("utf-8")
+        return f"{self.base_url}/feeds/{name}.xml"
+
+    def __enter__(self) -> "StubServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *_args) -> None:
+                return
+
+            def _send(self, status: int, body: bytes, content_type: str) -> None:
+                if stub.latency:
+                    time.sleep(stub.latency)
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Clients may abort oversized feeds mid-stream.
+                    self.close_connection = True
+
+            def do_GET(self) -> None:
+                name = self.path.rsplit("/", 1)[-1].removesuffix(".xml")
+                body = stub.feeds.get(name)
+                if not self.path.startswith("/feeds/") or body is None:
+                    self._send(404, b"not found", "text/plain")
+                    return
+                self._send(200, body, "application/rss+xml")
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                if self.path.lstrip("/") != "graphql":
+                    self._send(404, b"not found", "text/plain")
+                    return
+                with stub._lock:
+                    stub.graphql_calls += 1
+                payload = {
+                    "data": {
+                        "upsertRecording": {"id": "stub", "isrc": "stub"},
+                        "recordEntityTags": [{"id": "stub"}],
+                    }
+                }
+                self._send(200, json.dumps(payload).encode("utf-8"), "application/json")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bench-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
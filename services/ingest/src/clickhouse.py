@@ -0,0 +1,333 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger("ingest.clickhouse")
+
+# Outcomes of one insert attempt.
+INSERTED = "inserted"
+RETRY = "retry"  # ClickHouse answered with a server error
+UNAVAILABLE = "unavailable"  # ClickHouse could not be reached
+REJECTED = "rejected"  # ClickHouse refused the batch itself (4xx)
+
+
+def _encode_rows(rows: List[Dict[str, object]]) -> bytes:
+    lines = "\n".join(json.dumps(row, default=str, separators=(",", ":")) for row in rows)
+    return gzip.compress(lines.encode("utf-8"), compresslevel=5)
+
+
+def to_clickhouse_time(value: Optional[str]) -> str:
+    """Render an ISO timestamp (or now) in ClickHouse's `DateTime` text format."""
+    if value:
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            dt = datetime.now(timezone.utc)
+    else:
+        dt = datetime.now(timezone.utc)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class ClickHouseWriter:
+    """Buffered async writer for ClickHouse over the HTTP interface.
+
+    Rows are grouped per table and flushed as gzip-compressed `JSONEachRow` inserts once a
+    table buffer reaches `batch_size` or every `flush_interval` seconds. Producers block in
+    `write` while more than `max_pending` rows are waiting (backpressure). Batches that fail
+    with a server or transport error are spilled to `spill_dir` and retried on later flushes,
+    up to `max_attempts` times. Batches ClickHouse rejects outright (4xx, e.g. bad schema or
+    data) would fail forever, so they go straight to `spill_dir/rejected` for inspection.
+
+    Several worker processes may share one `spill_dir`: a worker claims a spilled file by
+    renaming it into its own `claimed-<pid>` directory before replaying it, so each batch is
+    inserted by one worker only. Once the spilled files reach `max_spill_bytes`, `write` waits
+    as it does for `max_pending` until replays bring the directory back under the cap.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        database: str,
+        *,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_pending: int = 10_000,
+        spill_dir: Optional[str] = None,
+        max_attempts: int = 20,
+        max_spill_bytes: int = 256 * 1024 * 1024,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        self.url = url.rstrip("/")
+        self.database = database
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.05, flush_interval)
+        self.max_pending = max(self.batch_size, max_pending)
+        self.spill_dir = spill_dir
+        self.max_attempts = max(1, max_attempts)
+        self.max_spill_bytes = max(1, max_spill_bytes)
+        self._claim_dir = os.path.join(spill_dir, f"claimed-{os.getpid()}") if spill_dir else None
+        self._headers = {"Content-Encoding": "gzip"}
+        if user:
+            self._headers["X-ClickHouse-User"] = user
+        if password:
+            self._headers["X-ClickHouse-Key"] = password
+        self._client = httpx.AsyncClient(timeout=timeout, transport=transport)
+        self._buffers: Dict[str, List[Dict[str, object]]] = {}
+        self._pending = 0
+        self._spill_full = False
+        self._capacity = asyncio.Condition()
+        self._flush_requested = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._attempts: Dict[str, int] = {}
+        self.inserted_rows = 0
+        self.spilled_batches = 0
+        self.rejected_batches = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def start(self) -> None:
+        if self.spill_dir:
+            os.makedirs(self._claim_dir, exist_ok=True)
+            self._release_abandoned_claims()
+            self._spill_full = self._spill_bytes() >= self.max_spill_bytes
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="clickhouse-writer")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # Let the loop finish a flush in progress; cancelling it mid-flush would lose the
+            # batches already taken out of the buffers.
+            self._stopping.set()
+            self._flush_requested.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        await self._client.aclose()
+
+    async def write(self, table: str, rows: List[Dict[str, object]]) -> None:
+        if not rows:
+            return
+        async with self._capacity:
+            await self._capacity.wait_for(
+                lambda: self._pending < self.max_pending and not self._spill_full
+            )
+            buffer = self._buffers.setdefault(table, [])
+            buffer.extend(rows)
+            self._pending += len(rows)
+            if len(buffer) >= self.batch_size:
+                self._flush_requested.set()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            batches = self._buffers
+            self._buffers = {}
+            for table, rows in batches.items():
+                for start in range(0, len(rows), self.batch_size):
+                    chunk = rows[start : start + self.batch_size]
+                    body = _encode_rows(chunk)
+                    outcome = await self._insert(table, body)
+                    if outcome == INSERTED:
+                        self.inserted_rows += len(chunk)
+                    elif outcome == REJECTED:
+                        self._reject(table, body)
+                    else:
+                        self._spill(table, body)
+            released = sum(len(rows) for rows in batches.values())
+            await self._retry_spilled()
+            spill_full = bool(self.spill_dir) and self._spill_bytes() >= self.max_spill_bytes
+            if spill_full and not self._spill_full:
+                logger.warning("ClickHouse spill directory is full; holding writes until it drains")
+            async with self._capacity:
+                self._pending -= released
+                self._spill_full = spill_full
+                self._capacity.notify_all()
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.exception("ClickHouse flush loop failed: %s", exc)
+
+    async def _insert(self, table: str, body: bytes) -> str:
+        params = {
+            "query": f"INSERT INTO {self.database}.{table} FORMAT JSONEachRow",
+            "date_time_input_format": "best_effort",
+        }
+        try:
+            response = await self._client.post(
+                f"{self.url}/", params=params, content=body, headers=self._headers
+            )
+            response.raise_for_status()
+            return INSERTED
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code < 500:
+                logger.error(
+                    "ClickHouse rejected insert into %s: %s %s",
+                    table,
+                    exc.response.status_code,
+                    exc.response.text[:500],
+                )
+                return REJECTED
+            logger.warning("ClickHouse insert into %s failed: %s", table, exc)
+            return RETRY
+        except httpx.HTTPError as exc:
+            logger.warning("ClickHouse insert into %s failed: %s", table, exc)
+            return UNAVAILABLE
+
+    @staticmethod
+    def _batch_name(table: str) -> str:
+        return f"{table}.{time.time_ns()}.{uuid.uuid4().hex[:8]}.jsonl.gz"
+
+    def _spill(self, table: str, body: bytes) -> None:
+        if not self.spill_dir:
+            logger.error("Dropping ClickHouse batch for %s; no spill directory configured", table)
+            return
+        path = os.path.join(self.spill_dir, self._batch_name(table))
+        # Write under a name the replay loop ignores so other workers never read a partial file.
+        with open(f"{path}.tmp", "wb") as handle:
+            handle.write(body)
+        os.replace(f"{path}.tmp", path)
+        self.spilled_batches += 1
+        logger.info("Spilled ClickHouse batch for %s to %s", table, path)
+
+    def _reject(self, table: str, body: bytes, path: Optional[str] = None) -> None:
+        """Move a batch that can never be inserted out of the retry queue."""
+        self.rejected_batches += 1
+        if not self.spill_dir:
+            logger.error("Dropping rejected ClickHouse batch for %s; no spill directory configured", table)
+            return
+        rejected_dir = os.path.join(self.spill_dir, "rejected")
+        os.makedirs(rejected_dir, exist_ok=True)
+        target = os.path.join(rejected_dir, os.path.basename(path) if path else self._batch_name(table))
+        if path:
+            os.replace(path, target)
+        else:
+            with open(target, "wb") as handle:
+                handle.write(body)
+        logger.error("Moved rejected ClickHouse batch for %s to %s", table, target)
+
+    def _spill_bytes(self) -> int:
+        """Size of the batches waiting in `spill_dir`, including ones claimed by any worker."""
+        if not os.path.isdir(self.spill_dir):
+            return 0
+        total = 0
+        for entry in os.scandir(self.spill_dir):
+            if entry.is_file() and entry.name.endswith(".jsonl.gz"):
+                total += entry.stat().st_size
+            elif entry.is_dir() and entry.name.startswith("claimed-"):
+                total += sum(
+                    claimed.stat().st_size
+                    for claimed in os.scandir(entry.path)
+                    if claimed.is_file()
+                )
+        return total
+
+    def _release_abandoned_claims(self) -> None:
+        """Return files claimed by workers that are no longer running to the shared queue."""
+        for entry in os.scandir(self.spill_dir):
+            if not entry.is_dir() or not entry.name.startswith("claimed-"):
+                continue
+            try:
+                pid = int(entry.name.split("-", 1)[1])
+            except ValueError:
+                continue
+            if pid != os.getpid() and _process_alive(pid):
+                continue
+            for name in os.listdir(entry.path):
+                os.replace(os.path.join(entry.path, name), os.path.join(self.spill_dir, name))
+            if pid != os.getpid():
+                os.rmdir(entry.path)
+
+    async def _retry_spilled(self, limit: int = 10) -> None:
+        if not self.spill_dir or not os.path.isdir(self.spill_dir):
+            return
+        names = sorted(name for name in os.listdir(self.spill_dir) if name.endswith(".jsonl.gz"))
+        for name in names[:limit]:
+            table = name.split(".", 1)[0]
+            queued = os.path.join(self.spill_dir, name)
+            path = os.path.join(self._claim_dir, name)
+            try:
+                os.rename(queued, path)
+            except FileNotFoundError:
+                # Another worker claimed it first.
+                continue
+            with open(path, "rb") as handle:
+                body = handle.read()
+            outcome = await self._insert(table, body)
+            if outcome == INSERTED:
+                os.remove(path)
+                self._attempts.pop(name, None)
+                logger.info("Replayed spilled ClickHouse batch %s", name)
+                continue
+            if outcome == UNAVAILABLE:
+                # ClickHouse is unreachable; keep the remaining files for the next tick.
+                os.replace(path, queued)
+                return
+            attempts = self._attempts.get(name, 0) + 1
+            if outcome == REJECTED or attempts >= self.max_attempts:
+                self._attempts.pop(name, None)
+                self._reject(table, body, path)
+            else:
+                # Move on so one failing batch does not hold back the files queued after it.
+                self._attempts[name] = attempts
+                os.replace(path, queued)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def build_news_item_row(
+    news_item_id: str,
+    normalized: Dict[str, Optional[str]],
+    tag_result: Dict[str, object]
+) -> Dict[str, object]:
+    tags = [tag_result.get(key) for key in ("artist", "work", "recording")]
+    return {
+        "id": news_item_id,
+        "source": normalized["source"],
+        "title": normalized["title"],
+        "url": normalized["url"],
+        "published_at": to_clickhouse_time(normalized.get("published_at")),
+        "tags": [tag for tag in tags if tag],
+    }
+
+
+def build_entity_link_rows(news_item_id: str, tags: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    return [
+        {
+            "news_id": news_item_id,
+            "entity_type": tag["entityType"],
+            "entity_id": tag["entityId"],
+            "confidence": tag["confidence"],
+        }
+        for tag in tags
+    ]
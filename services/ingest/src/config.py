@@ -1,22 +1,49 @@
 from functools import lru_cache
 from typing import Optional
 
-from pydantic import BaseSettings, AnyHttpUrl, AnyUrl
+from pydantic import AnyHttpUrl, AnyUrl
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     graph_api_base: AnyHttpUrl = "http://localhost:4000"
     duckdb_path: str = "data/insight.duckdb"
+    snapshot_dir: str = "data/snapshots"
+    isrc_ledger_enabled: bool = True
+    rss_max_feed_bytes: int = 5 * 1024 * 1024
+    rss_parse_executor: str = "process"  # "process" or "thread"
+    rss_parse_workers: int = 2
     redis_url: Optional[AnyUrl] = None
     tagging_fuzzy_threshold: int = 70
     tagging_embedding_threshold: float = 0.7
     tagging_use_embeddings: bool = False
     tagging_embeddings_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     tagging_embedding_cache_ttl: int = 60 * 60 * 24 * 7  # 7 days
+    tagging_embedding_backend: str = "torch"  # "torch", "torch-int8" or "onnx"
+    tagging_embedding_onnx_path: Optional[str] = None
+    tagging_embedding_threads: int = 0  # 0 keeps the runtime default
+    tagging_embedding_batch_size: int = 64
+    tagging_dictionary_path: Optional[str] = None
+    dedup_enabled: bool = True
+    dedup_max_distance: int = 3  # SimHash bits; must stay below the 4 LSH bands
+    dedup_window_hours: int = 48
+    otel_enabled: bool = False
+    admin_token: Optional[str] = None
+    profile_max_seconds: float = 60.0
+    profile_interval: float = 0.005  # seconds between stack samples
+    profile_signal_enabled: bool = False
+    profile_dir: str = "data/profiles"
+    clickhouse_url: Optional[AnyHttpUrl] = None
+    clickhouse_database: str = "insight"
+    clickhouse_user: Optional[str] = None
+    clickhouse_password: Optional[str] = None
+    clickhouse_batch_size: int = 500
+    clickhouse_flush_interval: float = 2.0  # seconds
+    clickhouse_max_pending: int = 10_000
+    clickhouse_spill_dir: str = "data/clickhouse-spill"
+    clickhouse_max_attempts: int = 20
+    clickhouse_max_spill_bytes: int = 256 * 1024 * 1024
 
-    class Config:
-        env_prefix = "INGEST_"
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(env_prefix="INGEST_", env_file=".env", case_sensitive=False, extra="ignore")
 
 @lru_cache
 def get_settings() -> Settings:
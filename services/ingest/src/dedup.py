@@ -0,0 +1,150 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import duckdb
+
+from .tagging.matcher import _normalize
+
+SIMHASH_BITS = 64
+BAND_BITS = 16
+BAND_COUNT = SIMHASH_BITS // BAND_BITS
+_BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def _features(text: str) -> List[str]:
+    tokens = _normalize(text).split()
+    # Unigrams carry vocabulary; bigrams keep reworded headlines from looking identical.
+    return tokens + [f"{left} {right}" for left, right in zip(tokens, tokens[1:])]
+
+
+def simhash(text: str) -> int:
+    """64-bit Charikar SimHash over normalized word uni- and bigrams."""
+    weights = [0] * SIMHASH_BITS
+    for feature in _features(text):
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def bands(fingerprint: int) -> List[int]:
+    # With BAND_COUNT bands, any two hashes within BAND_COUNT - 1 bits share at least one band.
+    return [(fingerprint >> (index * BAND_BITS)) & _BAND_MASK for index in range(BAND_COUNT)]
+
+
+@dataclass
+class NearDuplicate:
+    url: str
+    canonical_url: str
+    distance: int
+    tag_result: Dict[str, object]
+
+
+def find_near_duplicate(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    url: str,
+    fingerprint: int,
+    config_key: str,
+    max_distance: int,
+    window: timedelta,
+    now: Optional[datetime] = None
+) -> Optional[NearDuplicate]:
+    """Closest earlier item within `window` whose tags were computed with the same config."""
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    # One branch per band keeps each lookup on that band's index; an OR across bands scans the table.
+    probes = " UNION ALL ".join(
+        f"SELECT * FROM rss_fingerprints WHERE band{index} = ?" for index in range(BAND_COUNT)
+    )
+    row = conn.execute(
+        f"""
+        SELECT url, COALESCE(canonical_url, url), bit_count(xor(simhash, ?::UBIGINT)) AS distance, tag_result
+        FROM ({probes})
+        WHERE config_key = ?
+          AND seen_at >= ?
+          AND url <> ?
+          AND COALESCE(canonical_url, url) <> ?
+          AND bit_count(xor(simhash, ?::UBIGINT)) <= ?
+        ORDER BY distance, seen_at
+        LIMIT 1
+        """,
+        [fingerprint, *bands(fingerprint), config_key, now - window, url, url, fingerprint, max_distance],
+    ).fetchone()
+    if row is None:
+        return None
+    return NearDuplicate(url=row[0], canonical_url=row[1], distance=int(row[2]), tag_result=json.loads(row[3]))
+
+
+def find_recorded_duplicate(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    url: str,
+    fingerprint: int,
+    config_key: str
+) -> Optional[NearDuplicate]:
+    """The canonical item a re-polled `url` was matched to when first seen, if any.
+
+    Re-polled items are not looked up again: a canonical item would otherwise match its own
+    copies, and a copy could drift to a different canonical item.
+    """
+    row = conn.execute(
+        """
+        SELECT canonical.url, bit_count(xor(canonical.simhash, ?::UBIGINT)), canonical.tag_result
+        FROM rss_fingerprints AS item
+        JOIN rss_fingerprints AS canonical
+          ON canonical.url = item.canonical_url AND canonical.config_key = item.config_key
+        WHERE item.url = ? AND item.config_key = ?
+        """,
+        [fingerprint, url, config_key],
+    ).fetchone()
+    if row is None:
+        return None
+    return NearDuplicate(url=row[0], canonical_url=row[0], distance=int(row[1]), tag_result=json.loads(row[2]))
+
+
+def record_fingerprint(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    url: str,
+    fingerprint: int,
+    config_key: str,
+    tag_result: Dict[str, object],
+    canonical_url: Optional[str] = None,
+    now: Optional[datetime] = None
+) -> None:
+    """Store the fingerprint of `url`, keeping when it was first seen so re-polls age out."""
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    previous = conn.execute("SELECT seen_at FROM rss_fingerprints WHERE url = ?", [url]).fetchone()
+    if previous is not None:
+        now = previous[0]
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO rss_fingerprints
+            (url, simhash, {", ".join(f"band{index}" for index in range(BAND_COUNT))},
+             config_key, tag_result, canonical_url, seen_at)
+        VALUES (?, ?, {", ".join("?" for _ in range(BAND_COUNT))}, ?, ?, ?, ?)
+        """,
+        [url, fingerprint, *bands(fingerprint), config_key, json.dumps(tag_result), canonical_url, now],
+    )
+
+
+def prune_fingerprints(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    window: timedelta,
+    now: Optional[datetime] = None
+) -> int:
+    """Delete fingerprints older than `window`; they can no longer match."""
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    return conn.execute("DELETE FROM rss_fingerprints WHERE seen_at < ?", [now - window]).fetchone()[0]
+
+
+def update_fingerprint_tags(conn: duckdb.DuckDBPyConnection, *, url: str, tag_result: Dict[str, object]) -> None:
+    """Replace the tags stored for `url` and for copies that reuse them, e.g. after a retag."""
+    conn.execute(
+        "UPDATE rss_fingerprints SET tag_result = ? WHERE url = ? OR canonical_url = ?",
+        [json.dumps(tag_result), url, url],
+    )
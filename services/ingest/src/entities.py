@@ -0,0 +1,274 @@
+import hashlib
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import duckdb
+
+# Local mirror of ClickHouse `insight.entity_links` plus the rollups behind
+# `insight.entity_mentions_timeseries`. The rollups are adjusted by deltas whenever an item's
+# links change, so queries never rescan `entity_links`.
+
+EntityKey = Tuple[str, str]
+
+
+def news_item_id_for(url: str) -> str:
+    normalized = (url or "").strip()
+    if not normalized:
+        return str(uuid.uuid4())
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, normalized))
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _links_hash(links: Dict[EntityKey, float]) -> str:
+    payload = json.dumps(sorted([*key, confidence] for key, confidence in links.items()))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _apply_mention_delta(conn: duckdb.DuckDBPyConnection, row: List[object]) -> None:
+    entity_type, entity_id, day, mentions, confidence = row
+    updated = conn.execute(
+        """
+        UPDATE entity_mentions_daily
+        SET mentions = mentions + ?, confidence_sum = confidence_sum + ?
+        WHERE entity_type = ? AND entity_id = ? AND day = ?
+        """,
+        [mentions, confidence, entity_type, entity_id, day],
+    ).fetchone()[0]
+    if not updated:
+        conn.execute("INSERT INTO entity_mentions_daily VALUES (?, ?, ?, ?, ?)", row)
+
+
+def _apply_pair_delta(conn: duckdb.DuckDBPyConnection, row: List[object]) -> None:
+    day, left_type, left_id, right_type, right_id, mentions = row
+    updated = conn.execute(
+        """
+        UPDATE entity_co_mentions_daily
+        SET mentions = mentions + ?
+        WHERE day = ? AND left_type = ? AND left_id = ? AND right_type = ? AND right_id = ?
+        """,
+        [mentions, day, left_type, left_id, right_type, right_id],
+    ).fetchone()[0]
+    if not updated:
+        conn.execute("INSERT INTO entity_co_mentions_daily VALUES (?, ?, ?, ?, ?, ?)", row)
+
+
+def record_entity_links(
+    conn: duckdb.DuckDBPyConnection,
+    news_id: str,
+    tags: Sequence[Dict[str, object]],
+    *,
+    now: Optional[datetime] = None
+) -> bool:
+    """Replace the links of one news item and apply the difference to the daily rollups.
+
+    Re-ingesting an item keeps its original `linked_at`, so repeated fetches of the same feed do
+    not count a mention twice. Returns False when the item was already stored with these links.
+    """
+    new: Dict[EntityKey, float] = {
+        (str(tag["entityType"]), str(tag["entityId"])): float(tag["confidence"]) for tag in tags
+    }
+    links_hash = _links_hash(new)
+    state = conn.execute(
+        "SELECT links_hash, linked_at FROM entity_link_items WHERE news_id = ?", [news_id]
+    ).fetchone()
+    if state is not None and state[0] == links_hash:
+        return False
+    old: Dict[EntityKey, float] = {}
+    if state is not None:
+        old = {
+            (row[0], row[1]): row[2]
+            for row in conn.execute(
+                "SELECT entity_type, entity_id, confidence FROM entity_links WHERE news_id = ?", [news_id]
+            ).fetchall()
+        }
+    linked_at = state[1] if state is not None else (now or _utcnow())
+    day = linked_at.date()
+
+    mention_deltas = [
+        [key[0], key[1], day, (key in new) - (key in old), new.get(key, 0.0) - old.get(key, 0.0)]
+        for key in old.keys() | new.keys()
+    ]
+    old_pairs = set(combinations(sorted(old), 2))
+    new_pairs = set(combinations(sorted(new), 2))
+    pair_deltas = [[day, *left, *right, 1] for left, right in new_pairs - old_pairs]
+    pair_deltas += [[day, *left, *right, -1] for left, right in old_pairs - new_pairs]
+
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        if old:
+            conn.execute("DELETE FROM entity_links WHERE news_id = ?", [news_id])
+        if new:
+            conn.executemany(
+                "INSERT INTO entity_links VALUES (?, ?, ?, ?, ?)",
+                [
+                    [news_id, entity_type, entity_id, confidence, linked_at]
+                    for (entity_type, entity_id), confidence in new.items()
+                ],
+            )
+        conn.execute(
+            "INSERT OR REPLACE INTO entity_link_items VALUES (?, ?, ?)", [news_id, links_hash, linked_at]
+        )
+        for row in mention_deltas:
+            _apply_mention_delta(conn, row)
+        for row in pair_deltas:
+            _apply_pair_delta(conn, row)
+        if old:
+            conn.execute("DELETE FROM entity_mentions_daily WHERE day = ? AND mentions <= 0", [day])
+            conn.execute("DELETE FROM entity_co_mentions_daily WHERE day = ? AND mentions <= 0", [day])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return True
+
+
+def _group_links(rows: Iterable[Tuple[str, str, str, float]]) -> Dict[str, Dict[EntityKey, float]]:
+    grouped: Dict[str, Dict[EntityKey, float]] = {}
+    for news_id, entity_type, entity_id, confidence in rows:
+        grouped.setdefault(news_id, {})[(entity_type, entity_id)] = confidence
+    return grouped
+
+
+def rebuild_entity_rollups(conn: duckdb.DuckDBPyConnection) -> None:
+    """Recompute item state and both rollups from `entity_links` (e.g. after a snapshot import)."""
+    grouped = _group_links(
+        conn.execute("SELECT news_id, entity_type, entity_id, confidence FROM entity_links").fetchall()
+    )
+    linked_at = dict(conn.execute("SELECT news_id, min(linked_at) FROM entity_links GROUP BY news_id").fetchall())
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO entity_link_items VALUES (?, ?, ?)",
+            [[news_id, _links_hash(links), linked_at[news_id]] for news_id, links in grouped.items()],
+        )
+        conn.execute("DELETE FROM entity_mentions_daily")
+        conn.execute(
+            """
+            INSERT INTO entity_mentions_daily
+            SELECT entity_type, entity_id, CAST(linked_at AS DATE), count(*), sum(confidence)
+            FROM entity_links
+            GROUP BY ALL
+            """
+        )
+        conn.execute("DELETE FROM entity_co_mentions_daily")
+        conn.execute(
+            """
+            INSERT INTO entity_co_mentions_daily
+            SELECT CAST(l.linked_at AS DATE), l.entity_type, l.entity_id, r.entity_type, r.entity_id, count(*)
+            FROM entity_links AS l
+            JOIN entity_links AS r
+              ON l.news_id = r.news_id AND (l.entity_type, l.entity_id) < (r.entity_type, r.entity_id)
+            GROUP BY ALL
+            """
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _since(days: int, today: Optional[date] = None) -> date:
+    return (today or _utcnow().date()) - timedelta(days=max(1, days) - 1)
+
+
+def top_entities(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    days: int,
+    entity_type: Optional[str] = None,
+    limit: int = 20
+) -> List[Dict[str, object]]:
+    type_clause = "AND entity_type = ?" if entity_type else ""
+    rows = conn.execute(
+        f"""
+        SELECT entity_type, entity_id, sum(mentions) AS mentions, sum(confidence_sum) / sum(mentions)
+        FROM entity_mentions_daily
+        WHERE day >= ? {type_clause}
+        GROUP BY entity_type, entity_id
+        ORDER BY mentions DESC, entity_type, entity_id
+        LIMIT ?
+        """,
+        [_since(days), *([entity_type] if entity_type else []), limit],
+    ).fetchall()
+    return [
+        {"entity_type": row[0], "entity_id": row[1], "mentions": int(row[2]), "avg_confidence": float(row[3])}
+        for row in rows
+    ]
+
+
+def entity_timeseries(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    days: int,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[str] = None,
+    limit_entities: int = 5
+) -> List[Dict[str, object]]:
+    """Daily mentions for one entity, or for the top `limit_entities` in the window."""
+    since = _since(days)
+    if entity_id is not None:
+        if not entity_type:
+            raise ValueError("entity_id requires entity_type")
+        selected = [(entity_type, entity_id)]
+    else:
+        selected = [
+            (row["entity_type"], row["entity_id"])
+            for row in top_entities(conn, days=days, entity_type=entity_type, limit=limit_entities)
+        ]
+    if not selected:
+        return []
+    rows = conn.execute(
+        f"""
+        SELECT day, entity_type, entity_id, mentions, confidence_sum / mentions
+        FROM entity_mentions_daily
+        WHERE day >= ? AND ({" OR ".join("(entity_type = ? AND entity_id = ?)" for _ in selected)})
+        ORDER BY day, entity_type, entity_id
+        """,
+        [since, *[value for key in selected for value in key]],
+    ).fetchall()
+    return [
+        {
+            "day": row[0].isoformat(),
+            "entity_type": row[1],
+            "entity_id": row[2],
+            "mentions": int(row[3]),
+            "avg_confidence": float(row[4]),
+        }
+        for row in rows
+    ]
+
+
+def co_mentions(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    entity_type: str,
+    entity_id: str,
+    days: int,
+    limit: int = 20
+) -> List[Dict[str, object]]:
+    """Entities tagged on the same items as (`entity_type`, `entity_id`) within the window."""
+    rows = conn.execute(
+        """
+        SELECT other_type, other_id, sum(mentions) AS mentions
+        FROM (
+            SELECT right_type AS other_type, right_id AS other_id, mentions
+            FROM entity_co_mentions_daily
+            WHERE day >= ? AND left_type = ? AND left_id = ?
+            UNION ALL
+            SELECT left_type, left_id, mentions
+            FROM entity_co_mentions_daily
+            WHERE day >= ? AND right_type = ? AND right_id = ?
+        )
+        GROUP BY other_type, other_id
+        ORDER BY mentions DESC, other_type, other_id
+        LIMIT ?
+        """,
+        [_since(days), entity_type, entity_id] * 2 + [limit],
+    ).fetchall()
+    return [{"entity_type": row[0], "entity_id": row[1], "mentions": int(row[2])} for row in rows]
@@ -0,0 +1,30 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Sequence, Tuple
+
+import duckdb
+
+
+def content_hash(title: str, artist: str) -> str:
+    return hashlib.sha1(f"{title}\x1f{artist}".encode("utf-8")).hexdigest()
+
+
+def load_ledger(conn: duckdb.DuckDBPyConnection, isrcs: Sequence[str]) -> Dict[str, str]:
+    """Content hashes of the last successful upsert for each of `isrcs` that has one."""
+    if not isrcs:
+        return {}
+    rows = conn.execute(
+        "SELECT isrc, content_hash FROM isrc_ledger WHERE isrc IN (SELECT unnest(?::VARCHAR[]))",
+        [list(isrcs)],
+    ).fetchall()
+    return dict(rows)
+
+
+def record_upserts(conn: duckdb.DuckDBPyConnection, entries: Iterable[Tuple[str, str]]) -> None:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = [[isrc, digest, now] for isrc, digest in entries]
+    if rows:
+        conn.executemany(
+            "INSERT OR REPLACE INTO isrc_ledger (isrc, content_hash, upserted_at) VALUES (?, ?, ?)",
+            rows,
+        )
@@ -1,23 +1,43 @@
+import asyncio
 import csv
+import hmac
 import io
 import logging
-import os
 import re
-import uuid
-from datetime import datetime, timezone
-from typing import Dict, List, Optional, Sequence
+import threading
+import time
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, FrozenSet, List, Optional, Sequence
 
-import duckdb
-import feedparser
 import httpx
-from fastapi import Body, FastAPI, File, Form, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import Body, Depends, FastAPI, File, Form, Header, HTTPException, Query, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field, AnyHttpUrl
 
 ISRC_PATTERN = re.compile(r"^[A-Z]{2}[A-Z0-9]{3}\d{2}\d{5}$")
+ENTITY_TYPE_PATTERN = "^(artist|work|recording)$"
 
+from .clickhouse import ClickHouseWriter, build_entity_link_rows, build_news_item_row
 from .config import get_settings
+from .dedup import (
+    find_near_duplicate,
+    find_recorded_duplicate,
+    prune_fingerprints,
+    record_fingerprint,
+    simhash,
+    update_fingerprint_tags
+)
+from .entities import co_mentions, entity_timeseries, news_item_id_for, record_entity_links, top_entities
+from .feeds import FeedParseError, FeedTooLargeError, FetchedFeed, build_parse_executor, fetch_feed
+from .ledger import content_hash, load_ledger, record_upserts
+from .metrics import REGISTRY, REQUEST_SECONDS, REQUESTS_IN_FLIGHT, configure_tracing, stage
+from .profiling import install_signal_handler, profile
+from .snapshots import default_snapshot_name, export_snapshot, import_snapshot, resolve_snapshot_path
+from .store import connect_duckdb
 from .tagging import (
+    CompiledDictionary,
     EmbeddingClient,
     TaggingConfig,
     TaggingStoplist,
@@ -28,9 +48,171 @@ from .tagging import (
 logger = logging.getLogger("ingest")
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="Omnisonic Ingest Service")
-
 _embedding_client: Optional[EmbeddingClient] = None
+_clickhouse_writer: Optional[ClickHouseWriter] = None
+_parse_executor: Optional[Executor] = None
+_compiled_dictionary: Optional[CompiledDictionary] = None
+_route_paths: FrozenSet[str] = frozenset()
+
+
+def load_compiled_dictionary() -> Optional[CompiledDictionary]:
+    settings = get_settings()
+    if not settings.tagging_dictionary_path:
+        return None
+    try:
+        compiled = CompiledDictionary(settings.tagging_dictionary_path)
+    except (OSError, ValueError) as exc:
+        logger.warning("Failed to load tagging dictionary %s: %s", settings.tagging_dictionary_path, exc)
+        return None
+    built_with = (compiled.embedding_model, compiled.embedding_backend)
+    configured = (settings.tagging_embeddings_model, settings.tagging_embedding_backend)
+    if compiled.has_embeddings and built_with != configured:
+        # Cosine similarity is meaningless across models, and approximate backends drift from torch.
+        logger.warning(
+            "Tagging dictionary embeddings were built with %s (%s) but %s (%s) is configured; "
+            "embedding candidates at match time instead",
+            *built_with,
+            *configured,
+        )
+        compiled.drop_embeddings()
+    logger.info("Mapped tagging dictionary %s (%s)", compiled.path, compiled.counts())
+    return compiled
+
+
+def build_clickhouse_writer() -> Optional[ClickHouseWriter]:
+    settings = get_settings()
+    if not settings.clickhouse_url:
+        return None
+    return ClickHouseWriter(
+        str(settings.clickhouse_url),
+        settings.clickhouse_database,
+        user=settings.clickhouse_user,
+        password=settings.clickhouse_password,
+        batch_size=settings.clickhouse_batch_size,
+        flush_interval=settings.clickhouse_flush_interval,
+        max_pending=settings.clickhouse_max_pending,
+        spill_dir=settings.clickhouse_spill_dir,
+        max_attempts=settings.clickhouse_max_attempts,
+        max_spill_bytes=settings.clickhouse_max_spill_bytes,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _clickhouse_writer, _parse_executor, _compiled_dictionary, _embedding_client, _route_paths
+    settings = get_settings()
+    # Every route is registered by now; the request middleware labels metrics against this set.
+    _route_paths = frozenset(getattr(route, "path", None) for route in app.routes) - {None}
+    if settings.otel_enabled:
+        configure_tracing("omnisonic-ingest")
+    if settings.profile_signal_enabled:
+        install_signal_handler(
+            settings.profile_dir,
+            seconds=min(10.0, settings.profile_max_seconds),
+            interval=settings.profile_interval,
+            loop=asyncio.get_running_loop(),
+        )
+    _compiled_dictionary = load_compiled_dictionary()
+    if settings.tagging_use_embeddings:
+        # Load and warm the model before serving so no request pays for it.
+        client = await asyncio.to_thread(ensure_embedding_client)
+        if client is not None:
+            warmup_seconds = await asyncio.to_thread(client.warm_up)
+            logger.info(
+                "Embedding model %s (%s) warm in %.2fs", client.model_name, client.backend, warmup_seconds or 0.0
+            )
+    _parse_executor = build_parse_executor(settings.rss_parse_executor, settings.rss_parse_workers)
+    _clickhouse_writer = build_clickhouse_writer()
+    if _clickhouse_writer is not None:
+        await _clickhouse_writer.start()
+    try:
+        yield
+    finally:
+        if _clickhouse_writer is not None:
+            await _clickhouse_writer.stop()
+            _clickhouse_writer = None
+        _parse_executor.shutdown(wait=False, cancel_futures=True)
+        _parse_executor = None
+
+
+async def label_current_task(request: Request) -> None:
+    # Named tasks let the profiler attribute samples and awaits to the route being served.
+    task = asyncio.current_task()
+    route = request.scope.get("route")
+    if task is not None and route is not None:
+        task.set_name(f"{request.method} {route.path}")
+
+
+app = FastAPI(title="Omnisonic Ingest Service", lifespan=lifespan, dependencies=[Depends(label_current_task)])
+
+
+def _route_label(path: str) -> str:
+    # Unknown paths share one label so scanners cannot blow up metric cardinality.
+    return path if path in _route_paths else "other"
+
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    path = _route_label(request.url.path)
+    REQUESTS_IN_FLIGHT.inc(path)
+    started = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec(path)
+        REQUEST_SECONDS.observe(path, request.method, status, value=time.perf_counter() - started)
+
+
+@app.get("/healthz")
+async def healthz():
+    return {"ok": True}
+
+
+@app.get("/readyz")
+async def readyz():
+    settings = get_settings()
+    embeddings = _embedding_client.status() if _embedding_client is not None else None
+    ready = not settings.tagging_use_embeddings or bool(embeddings and embeddings["loaded"] and embeddings["warm"])
+    payload = {
+        "ready": ready,
+        "embeddings": {"required": settings.tagging_use_embeddings, "client": embeddings},
+        "dictionary": _compiled_dictionary.counts() if _compiled_dictionary is not None else None,
+        "clickhouse_pending": _clickhouse_writer.pending if _clickhouse_writer is not None else None,
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=payload)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/admin/profile")
+async def profile_worker(
+    seconds: float = Query(default=10.0, gt=0),
+    format: str = Query(default="collapsed", pattern="^(collapsed|json)$"),
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    settings = get_settings()
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    duration = min(seconds, settings.profile_max_seconds)
+    loop = asyncio.get_running_loop()
+    try:
+        sampler = await asyncio.to_thread(
+            profile, duration, settings.profile_interval, loop, threading.get_ident()
+        )
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if format == "json":
+        return {"seconds": duration, **sampler.summary()}
+    return PlainTextResponse(sampler.collapsed())
 
 
 def ensure_embedding_client(force: bool = False) -> Optional[EmbeddingClient]:
@@ -47,7 +229,11 @@ def ensure_embedding_client(force: bool = False) -> Optional[EmbeddingClient]:
     client = get_embedding_client(
         model_name=settings.tagging_embeddings_model,
         cache_ttl=settings.tagging_embedding_cache_ttl,
-        redis_url=str(settings.redis_url) if settings.redis_url else None
+        redis_url=str(settings.redis_url) if settings.redis_url else None,
+        backend=settings.tagging_embedding_backend,
+        threads=settings.tagging_embedding_threads,
+        onnx_path=settings.tagging_embedding_onnx_path,
+        batch_size=settings.tagging_embedding_batch_size,
     )
     _embedding_client = client
     return client if client.enabled else None
@@ -66,6 +252,8 @@ def build_tagging_config(
     use_embeddings: Optional[bool]
 ) -> TaggingConfig:
     settings = get_settings()
+    # Requests without their own labels fall back to the shared, memory-mapped dictionary.
+    compiled = _compiled_dictionary if not (artists or works or recordings) else None
     return TaggingConfig(
         artists=artists,
         works=works,
@@ -78,16 +266,10 @@ def build_tagging_config(
         fuzzy_threshold=fuzzy_threshold or settings.tagging_fuzzy_threshold,
         embedding_threshold=embedding_threshold or settings.tagging_embedding_threshold,
         use_embeddings=use_embeddings if use_embeddings is not None else settings.tagging_use_embeddings,
+        compiled=compiled,
     )
 
 
-def news_item_id_for(url: str) -> str:
-    normalized = (url or "").strip()
-    if not normalized:
-        return str(uuid.uuid4())
-    return str(uuid.uuid5(uuid.NAMESPACE_URL, normalized))
-
-
 ENTITY_TAG_MUTATION = """
   mutation RecordEntityTags($input: EntityTagBatchInput!) {
     recordEntityTags(input: $input) { id }
@@ -102,19 +284,20 @@ async def record_entity_tags(
     tags: List[Dict[str, object]]
 ) -> bool:
     try:
-        response = await client.post(
-            f"{base_url}/graphql",
-            json={
-                "query": ENTITY_TAG_MUTATION,
-                "variables": {
-                    "input": {
-                        "newsItemId": news_item_id,
-                        "tags": tags
+        with stage("graph_api"):
+            response = await client.post(
+                f"{base_url}/graphql",
+                json={
+                    "query": ENTITY_TAG_MUTATION,
+                    "variables": {
+                        "input": {
+                            "newsItemId": news_item_id,
+                            "tags": tags
+                        }
                     }
-                }
-            },
-            timeout=15.0
-        )
+                },
+                timeout=15.0
+            )
         response.raise_for_status()
         payload = response.json()
         if "errors" in payload:
@@ -153,6 +336,8 @@ class IngestResponse(BaseModel):
     processed: int = Field(..., ge=0)
     accepted: int = Field(..., ge=0)
     rejected: int = Field(..., ge=0)
+    skipped_unchanged: int = Field(default=0, ge=0)
+    skipped_duplicates: int = Field(default=0, ge=0)
     errors: List[str] = Field(default_factory=list)
 
 
@@ -173,6 +358,7 @@ class RssIngestRequest(BaseModel):
 class RssTaggedItem(BaseModel):
     news_item_id: str
     url: str
+    duplicate_of: Optional[str] = None
     artist: Optional[str]
     work: Optional[str]
     recording: Optional[str]
@@ -187,6 +373,9 @@ class RssFeedSummary(BaseModel):
     processed: int
     inserted: int
     skipped: int
+    duplicates: int = 0
+    size_bytes: Optional[int] = None
+    parse_ms: Optional[float] = None
     tagged: List[RssTaggedItem] = Field(default_factory=list)
 
 
@@ -218,29 +407,73 @@ class TaggingImproveResponse(BaseModel):
     failures: int
     items: List[RssTaggedItem]
 
+class SnapshotExportRequest(BaseModel):
+    name: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+
+class SnapshotImportRequest(BaseModel):
+    name: str
+
+
+class SnapshotResponse(BaseModel):
+    name: str
+    path: str
+    rows: Dict[str, int]
+
+
+class EntityMention(BaseModel):
+    entity_type: str
+    entity_id: str
+    mentions: int
+    avg_confidence: Optional[float] = None
+
+
+class EntityMentionDay(EntityMention):
+    day: str
+
+
+class EntityTopResponse(BaseModel):
+    days: int
+    entities: List[EntityMention]
+
+
+class EntityTimeseriesResponse(BaseModel):
+    days: int
+    points: List[EntityMentionDay]
+
+
+class EntityCoMentionsResponse(BaseModel):
+    entity_type: str
+    entity_id: str
+    days: int
+    entities: List[EntityMention]
+
 async def upsert_recording(client: httpx.AsyncClient, base_url: str, track: RawTrack) -> bool:
     try:
-        response = await client.post(
-            f"{base_url}/graphql",
-            json={
-                "query": """
-                  mutation UpsertRecording($input: RecordingUpsertInput!) {
-                    upsertRecording(input: $input) {
-                      id
-                      isrc
-                    }
-                  }
-                """,
-                "variables": {
-                    "input": {
-                        "isrc": track.isrc,
-                        "title": track.title,
-                        "primaryArtist": track.artist
+        with stage("graph_api"):
+            response = await client.post(
+                f"{base_url}/graphql",
+                json={
+                    "query": """
+                      mutation UpsertRecording($input: RecordingUpsertInput!) {
+                        upsertRecording(input: $input) {
+                          id
+                          isrc
+                        }
+                      }
+                    """,
+                    "variables": {
+                        "input": {
+                            "isrc": track.isrc,
+                            "title": track.title,
+                            "primaryArtist": track.artist
+                        }
                     }
-                }
-            },
-            timeout=15.0,
-        )
+                },
+                timeout=15.0,
+            )
         response.raise_for_status()
         data = response.json()
         if "errors" in data:
@@ -256,28 +489,56 @@ async def ingest_tracks(tracks: List[RawTrack]) -> IngestResponse:
     processed = len(tracks)
     accepted = 0
     rejected = 0
+    skipped_unchanged = 0
     errors: List[str] = []
 
-    async with httpx.AsyncClient() as client:
-        for track in tracks:
-            candidate_isrc = track.isrc.upper().replace("-", "")
-            if not ISRC_PATTERN.fullmatch(candidate_isrc):
-                rejected += 1
-                errors.append(track.isrc)
-                continue
-            normalized = RawTrack(
-                isrc=candidate_isrc,
-                title=track.title.strip(),
-                artist=track.artist.strip()
-            )
-            success = await upsert_recording(client, settings.graph_api_base, normalized)
-            if success:
-                accepted += 1
-            else:
-                rejected += 1
-                errors.append(normalized.isrc)
+    # Later rows for the same ISRC supersede earlier ones within an upload.
+    latest: Dict[str, RawTrack] = {}
+    for track in tracks:
+        candidate_isrc = track.isrc.upper().replace("-", "")
+        if not ISRC_PATTERN.fullmatch(candidate_isrc):
+            rejected += 1
+            errors.append(track.isrc)
+            continue
+        latest.pop(candidate_isrc, None)
+        latest[candidate_isrc] = RawTrack(
+            isrc=candidate_isrc,
+            title=track.title.strip(),
+            artist=track.artist.strip()
+        )
+    skipped_duplicates = processed - rejected - len(latest)
 
-    return IngestResponse(processed=processed, accepted=accepted, rejected=rejected, errors=errors)
+    conn = connect_duckdb(settings.duckdb_path) if settings.isrc_ledger_enabled else None
+    try:
+        ledger = load_ledger(conn, list(latest)) if conn is not None else {}
+        upserted: List[tuple] = []
+        async with httpx.AsyncClient() as client:
+            for normalized in latest.values():
+                digest = content_hash(normalized.title, normalized.artist)
+                if ledger.get(normalized.isrc) == digest:
+                    skipped_unchanged += 1
+                    continue
+                success = await upsert_recording(client, settings.graph_api_base, normalized)
+                if success:
+                    accepted += 1
+                    upserted.append((normalized.isrc, digest))
+                else:
+                    rejected += 1
+                    errors.append(normalized.isrc)
+        if conn is not None:
+            record_upserts(conn, upserted)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    return IngestResponse(
+        processed=processed,
+        accepted=accepted,
+        rejected=rejected,
+        skipped_unchanged=skipped_unchanged,
+        skipped_duplicates=skipped_duplicates,
+        errors=errors,
+    )
 
 @app.post("/ingest/isrc", response_model=IngestResponse)
 async def ingest_isrc(
@@ -312,19 +573,6 @@ async def ingest_isrc(
     return JSONResponse(status_code=202, content=result.model_dump())
 
 
-def _ensure_duckdb_schema(conn: duckdb.DuckDBPyConnection) -> None:
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS rss_items (
-            source TEXT,
-            title TEXT,
-            url TEXT PRIMARY KEY,
-            published_at TIMESTAMP
-        )
-        """
-    )
-
-
 def _to_iso_time(struct_time) -> Optional[str]:
     if struct_time is None:
         return None
@@ -335,13 +583,7 @@ def _to_iso_time(struct_time) -> Optional[str]:
         return None
 
 
-async def _fetch_feed(client: httpx.AsyncClient, url: str) -> feedparser.FeedParserDict:
-    response = await client.get(url, timeout=15.0)
-    response.raise_for_status()
-    return feedparser.parse(response.text)
-
-
-def _normalize_entry(feed, entry) -> Optional[dict]:
+def _normalize_entry(feed: FetchedFeed, entry: dict) -> Optional[dict]:
     title = entry.get("title", "").strip()
     link = entry.get("link", "").strip()
     if not title or not link:
@@ -349,8 +591,7 @@ def _normalize_entry(feed, entry) -> Optional[dict]:
 
     published = entry.get("published_parsed") or entry.get("updated_parsed")
     published_at = _to_iso_time(published)
-    source = feed.feed.get("title") if feed.get("feed") else None
-    source = (source or feed.get("href") or "Unknown").strip()
+    source = (feed.title or feed.href or "Unknown").strip()
 
     return {
         "source": source,
@@ -366,16 +607,14 @@ async def ingest_rss(request: RssIngestRequest) -> RssIngestResponse:
         raise HTTPException(status_code=400, detail="No feed URLs provided")
 
     settings = get_settings()
-    os.makedirs(os.path.dirname(settings.duckdb_path) or ".", exist_ok=True)
 
     async with httpx.AsyncClient() as client:
         summaries: List[RssFeedSummary] = []
         total_processed = 0
         total_inserted = 0
 
-        conn = duckdb.connect(settings.duckdb_path)
+        conn = connect_duckdb(settings.duckdb_path)
         try:
-            _ensure_duckdb_schema(conn)
             tagging_config = build_tagging_config(
                 artists=request.artists,
                 works=request.works,
@@ -388,58 +627,137 @@ async def ingest_rss(request: RssIngestRequest) -> RssIngestResponse:
                 use_embeddings=request.use_embeddings,
             )
             embedding_client = ensure_embedding_client(force=tagging_config.use_embeddings)
+            dedup_key = None
+            if settings.dedup_enabled:
+                dedup_key = tagging_config.fingerprint()
+                if tagging_config.use_embeddings:
+                    dedup_key = (
+                        f"{dedup_key}:{settings.tagging_embeddings_model}:{settings.tagging_embedding_backend}"
+                    )
+                prune_fingerprints(conn, window=timedelta(hours=settings.dedup_window_hours))
             for url in request.urls:
                 try:
-                    feed = await _fetch_feed(client, str(url))
+                    fetched = await fetch_feed(
+                        client,
+                        str(url),
+                        max_bytes=settings.rss_max_feed_bytes,
+                        executor=_parse_executor,
+                        limit=request.limit_per_feed or 50,
+                    )
+                except FeedTooLargeError as exc:
+                    logger.warning("Skipping RSS feed %s: %s", url, exc)
+                    summaries.append(
+                        RssFeedSummary(url=url, source="Feed too large", processed=0, inserted=0, skipped=0)
+                    )
+                    continue
                 except httpx.HTTPError as exc:
                     logger.warning("Failed to fetch RSS feed %s: %s", url, exc)
                     summaries.append(
                         RssFeedSummary(url=url, source="Fetch error", processed=0, inserted=0, skipped=0)
                     )
                     continue
+                except FeedParseError as exc:
+                    logger.warning("Skipping RSS feed %s: %s", url, exc)
+                    summaries.append(
+                        RssFeedSummary(url=url, source="Parse error", processed=0, inserted=0, skipped=0)
+                    )
+                    continue
 
-                entries = feed.entries[: request.limit_per_feed or 50]
+                entries = fetched.entries[: request.limit_per_feed or 50]
                 processed = 0
                 inserted = 0
+                duplicates = 0
                 tagged_items: List[RssTaggedItem] = []
 
                 for entry in entries:
                     processed += 1
-                    normalized = _normalize_entry(feed, entry)
+                    normalized = _normalize_entry(fetched, entry)
                     if not normalized:
                         continue
 
-                    conn.execute(
-                        """
-                        INSERT OR REPLACE INTO rss_items (source, title, url, published_at)
-                        VALUES (?, ?, ?, ?)
-                        """,
-                        [
-                            normalized["source"],
-                            normalized["title"],
-                            normalized["url"],
-                            normalized["published_at"],
-                        ],
-                    )
+                    with stage("duckdb_insert"):
+                        is_new_item = (
+                            conn.execute("SELECT 1 FROM rss_items WHERE url = ?", [normalized["url"]]).fetchone()
+                            is None
+                        )
+                        conn.execute(
+                            """
+                            INSERT OR REPLACE INTO rss_items (source, title, url, published_at)
+                            VALUES (?, ?, ?, ?)
+                            """,
+                            [
+                                normalized["source"],
+                                normalized["title"],
+                                normalized["url"],
+                                normalized["published_at"],
+                            ],
+                        )
                     inserted += 1
-                    tag_result = match_entities(
-                        title=normalized["title"],
-                        description=entry.get("summary"),
-                        config=tagging_config,
-                        embedding_client=embedding_client,
-                    )
+                    duplicate = None
+                    if dedup_key is not None:
+                        with stage("dedup_lookup"):
+                            fingerprint = simhash(f"{normalized['title']} {entry.get('summary') or ''}")
+                            if is_new_item:
+                                duplicate = find_near_duplicate(
+                                    conn,
+                                    url=normalized["url"],
+                                    fingerprint=fingerprint,
+                                    config_key=dedup_key,
+                                    max_distance=settings.dedup_max_distance,
+                                    window=timedelta(hours=settings.dedup_window_hours),
+                                )
+                            else:
+                                duplicate = find_recorded_duplicate(
+                                    conn, url=normalized["url"], fingerprint=fingerprint, config_key=dedup_key
+                                )
+                    if duplicate is not None:
+                        # Syndicated copy: reuse the canonical item's tags and skip downstream writes.
+                        duplicates += 1
+                        tag_result = duplicate.tag_result
+                    else:
+                        with stage("match_entities"):
+                            tag_result = match_entities(
+                                title=normalized["title"],
+                                description=entry.get("summary"),
+                                config=tagging_config,
+                                embedding_client=embedding_client,
+                            )
+                    if dedup_key is not None:
+                        record_fingerprint(
+                            conn,
+                            url=normalized["url"],
+                            fingerprint=fingerprint,
+                            config_key=dedup_key,
+                            tag_result=tag_result,
+                            canonical_url=duplicate.canonical_url if duplicate is not None else None,
+                        )
                     news_item_id = news_item_id_for(normalized["url"])
                     tag_payload = build_tag_payload(tag_result)
-                    await record_entity_tags(
-                        client,
-                        settings.graph_api_base,
-                        news_item_id,
-                        tag_payload,
-                    )
+                    if duplicate is None:
+                        with stage("entity_rollups"):
+                            record_entity_links(conn, news_item_id, tag_payload)
+                        await record_entity_tags(
+                            client,
+                            settings.graph_api_base,
+                            news_item_id,
+                            tag_payload,
+                        )
+                    # The ClickHouse tables are append-only MergeTree and cannot retract a row, so
+                    # only the first sighting of an item is sent; later retags stay in DuckDB.
+                    if _clickhouse_writer is not None and is_new_item:
+                        with stage("clickhouse_enqueue"):
+                            await _clickhouse_writer.write(
+                                "news_items", [build_news_item_row(news_item_id, normalized, tag_result)]
+                            )
+                            if duplicate is None:
+                                await _clickhouse_writer.write(
+                                    "entity_links", build_entity_link_rows(news_item_id, tag_payload)
+                                )
                     tagged_items.append(
                         RssTaggedItem(
                             news_item_id=news_item_id,
                             url=normalized["url"],
+                            duplicate_of=news_item_id_for(duplicate.canonical_url) if duplicate is not None else None,
                             artist=tag_result["artist"],
                             work=tag_result["work"],
                             recording=tag_result["recording"],
@@ -458,10 +776,13 @@ async def ingest_rss(request: RssIngestRequest) -> RssIngestResponse:
                 summaries.append(
                     RssFeedSummary(
                         url=url,
-                        source=feed.feed.get("title", "Unknown Source") if feed.get("feed") else "Unknown",
+                        source=fetched.title or "Unknown Source",
                         processed=processed,
                         inserted=inserted,
                         skipped=processed - inserted,
+                        duplicates=duplicates,
+                        size_bytes=fetched.size_bytes,
+                        parse_ms=round(fetched.parse_seconds * 1000, 2),
                         tagged=tagged_items,
                     )
                 )
@@ -485,10 +806,8 @@ def run() -> None:
 @app.post("/ingest/tagging/improve", response_model=TaggingImproveResponse)
 async def improve_tagging(request: TaggingImproveRequest) -> TaggingImproveResponse:
     settings = get_settings()
-    os.makedirs(os.path.dirname(settings.duckdb_path) or ".", exist_ok=True)
-    conn = duckdb.connect(settings.duckdb_path)
+    conn = connect_duckdb(settings.duckdb_path)
     try:
-        _ensure_duckdb_schema(conn)
         query = "SELECT source, title, url, published_at FROM rss_items"
         clauses: List[str] = []
         params: List[object] = []
@@ -524,6 +843,7 @@ async def improve_tagging(request: TaggingImproveRequest) -> TaggingImproveRespo
     embedding_client = ensure_embedding_client(force=tagging_config.use_embeddings)
 
     retagged_items: List[RssTaggedItem] = []
+    retagged_links: List[tuple] = []
     updated = 0
     failures = 0
 
@@ -532,17 +852,19 @@ async def improve_tagging(request: TaggingImproveRequest) -> TaggingImproveRespo
 
     async with httpx.AsyncClient() as client:
         for _source, title, url_value, _ in rows:
-            tag_result = match_entities(
-                title=title or "",
-                description=None,
-                config=tagging_config,
-                embedding_client=embedding_client,
-            )
+            with stage("match_entities"):
+                tag_result = match_entities(
+                    title=title or "",
+                    description=None,
+                    config=tagging_config,
+                    embedding_client=embedding_client,
+                )
             news_item_id = news_item_id_for(url_value)
             payload = build_tag_payload(tag_result)
             success = await record_entity_tags(client, settings.graph_api_base, news_item_id, payload)
             if success:
                 updated += 1
+                retagged_links.append((url_value, news_item_id, tag_result, payload))
             else:
                 failures += 1
             retagged_items.append(
@@ -564,4 +886,112 @@ async def improve_tagging(request: TaggingImproveRequest) -> TaggingImproveRespo
                 )
             )
 
+    # Keep the local rollups, and the tags near-duplicates reuse, in step with the Graph API.
+    # ClickHouse keeps the first tagging; see the note in ingest_rss.
+    conn = connect_duckdb(settings.duckdb_path)
+    try:
+        for url_value, news_item_id, tag_result, payload in retagged_links:
+            record_entity_links(conn, news_item_id, payload)
+            update_fingerprint_tags(conn, url=url_value, tag_result=tag_result)
+    finally:
+        conn.close()
+
     return TaggingImproveResponse(retagged=len(rows), updated=updated, failures=failures, items=retagged_items)
+
+
+
+def _run_snapshot_export(path: str, request: SnapshotExportRequest) -> Dict[str, int]:
+    conn = connect_duckdb(get_settings().duckdb_path)
+    try:
+        manifest = export_snapshot(conn, path, since=request.since, until=request.until)
+    finally:
+        conn.close()
+    return manifest["tables"]
+
+
+def _run_snapshot_import(path: str) -> Dict[str, int]:
+    conn = connect_duckdb(get_settings().duckdb_path)
+    try:
+        return import_snapshot(conn, path)
+    finally:
+        conn.close()
+
+
+@app.post("/ingest/snapshots/export", response_model=SnapshotResponse)
+async def export_rss_snapshot(request: SnapshotExportRequest) -> SnapshotResponse:
+    settings = get_settings()
+    name = request.name or default_snapshot_name()
+    try:
+        path = resolve_snapshot_path(settings.snapshot_dir, name)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # COPY runs on a worker thread so feed ingestion keeps being served meanwhile.
+    rows = await asyncio.to_thread(_run_snapshot_export, path, request)
+    return SnapshotResponse(name=name, path=path, rows=rows)
+
+
+@app.post("/ingest/snapshots/import", response_model=SnapshotResponse)
+async def import_rss_snapshot(request: SnapshotImportRequest) -> SnapshotResponse:
+    settings = get_settings()
+    try:
+        path = resolve_snapshot_path(settings.snapshot_dir, request.name)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        rows = await asyncio.to_thread(_run_snapshot_import, path)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return SnapshotResponse(name=request.name, path=path, rows=rows)
+
+
+@app.get("/ingest/entities/top", response_model=EntityTopResponse)
+async def get_top_entities(
+    days: int = Query(default=7, ge=1, le=3650),
+    entity_type: Optional[str] = Query(default=None, pattern=ENTITY_TYPE_PATTERN),
+    limit: int = Query(default=20, ge=1, le=500),
+) -> EntityTopResponse:
+    conn = connect_duckdb(get_settings().duckdb_path)
+    try:
+        rows = top_entities(conn, days=days, entity_type=entity_type, limit=limit)
+    finally:
+        conn.close()
+    return EntityTopResponse(days=days, entities=[EntityMention(**row) for row in rows])
+
+
+@app.get("/ingest/entities/timeseries", response_model=EntityTimeseriesResponse)
+async def get_entity_timeseries(
+    days: int = Query(default=30, ge=1, le=3650),
+    entity_type: Optional[str] = Query(default=None, pattern=ENTITY_TYPE_PATTERN),
+    entity_id: Optional[str] = None,
+    limit: int = Query(default=5, ge=1, le=100),
+) -> EntityTimeseriesResponse:
+    if entity_id is not None and entity_type is None:
+        raise HTTPException(status_code=400, detail="entity_id requires entity_type")
+    conn = connect_duckdb(get_settings().duckdb_path)
+    try:
+        rows = entity_timeseries(
+            conn, days=days, entity_type=entity_type, entity_id=entity_id, limit_entities=limit
+        )
+    finally:
+        conn.close()
+    return EntityTimeseriesResponse(days=days, points=[EntityMentionDay(**row) for row in rows])
+
+
+@app.get("/ingest/entities/co-mentions", response_model=EntityCoMentionsResponse)
+async def get_entity_co_mentions(
+    entity_type: str = Query(..., pattern=ENTITY_TYPE_PATTERN),
+    entity_id: str = Query(..., min_length=1),
+    days: int = Query(default=30, ge=1, le=3650),
+    limit: int = Query(default=20, ge=1, le=500),
+) -> EntityCoMentionsResponse:
+    conn = connect_duckdb(get_settings().duckdb_path)
+    try:
+        rows = co_mentions(conn, entity_type=entity_type, entity_id=entity_id, days=days, limit=limit)
+    finally:
+        conn.close()
+    return EntityCoMentionsResponse(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        days=days,
+        entities=[EntityMention(**row) for row in rows],
+    )
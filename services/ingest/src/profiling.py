@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from types import FrameType
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("ingest.profiling")
+
+_profile_lock = threading.Lock()
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stack(frame: Optional[FrameType]) -> List[str]:
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _coroutine_stack(coro) -> List[str]:
+    labels: List[str] = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        labels.append(_frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return labels
+
+
+class StackSampler:
+    """Statistical profiler over `sys._current_frames`.
+
+    Every `interval` seconds it records the stack of each Python thread. When `loop` is given,
+    samples from the loop thread are prefixed with the running task's name and every suspended
+    task contributes an `await:` stack, so time spent waiting inside `/ingest/*` handlers shows
+    up alongside CPU time.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        loop_thread_id: Optional[int] = None
+    ) -> None:
+        self.interval = max(0.001, interval)
+        self.loop = loop
+        self.loop_thread_id = loop_thread_id
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+
+    def _tasks(self) -> List[asyncio.Task]:
+        if self.loop is None:
+            return []
+        for _ in range(3):
+            try:
+                return list(asyncio.all_tasks(self.loop))
+            except RuntimeError:  # the task set changed while we copied it
+                continue
+        return []
+
+    def _sample(self, own_thread: int) -> None:
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        tasks = self._tasks()
+        running = next((task for task in tasks if getattr(task.get_coro(), "cr_running", False)), None)
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            root = f"thread:{thread_names.get(thread_id, thread_id)}"
+            if thread_id == self.loop_thread_id and running is not None:
+                root = f"{root};task:{running.get_name()}"
+            self.samples[";".join([root, *_stack(frame)])] += 1
+        for task in tasks:
+            if task is running:
+                continue
+            stack = _coroutine_stack(task.get_coro())
+            if stack:
+                self.samples[";".join([f"await:{task.get_name()}", *stack])] += 1
+        self.sample_count += 1
+
+    def run(self, seconds: float) -> None:
+        own_thread = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self._sample(own_thread)
+            time.sleep(self.interval)
+
+    def collapsed(self) -> str:
+        """Folded stacks (`frame;frame;frame count`), ready for flamegraph.pl or speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+    def summary(self, limit: int = 25) -> Dict[str, object]:
+        leaves: Counter = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "samples": self.sample_count,
+            "interval_s": self.interval,
+            "top_frames": [{"frame": frame, "samples": count} for frame, count in leaves.most_common(limit)],
+        }
+
+
+def profile(
+    seconds: float,
+    interval: float,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+    loop_thread_id: Optional[int] = None
+) -> StackSampler:
+    """Run a sampler for `seconds`; only one profile may run per process at a time."""
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already running")
+    try:
+        sampler = StackSampler(interval=interval, loop=loop, loop_thread_id=loop_thread_id)
+        sampler.run(seconds)
+        return sampler
+    finally:
+        _profile_lock.release()
+
+
+def install_signal_handler(
+    output_dir: str,
+    seconds: float,
+    interval: float,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+    signum: int = getattr(signal, "SIGUSR2", 0)
+) -> bool:
+    """Write a collapsed-stack profile to `output_dir` whenever the worker receives `signum`.
+
+    Must be called from the main thread; when `loop` is given, that is also its loop thread.
+    """
+    if not signum:
+        return False
+    loop_thread_id = threading.get_ident() if loop is not None else None
+
+    def _write_profile() -> None:
+        try:
+            sampler = profile(seconds, interval, loop, loop_thread_id)
+        except RuntimeError as exc:
+            logger.warning("Skipping signal-triggered profile: %s", exc)
+            return
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = os.path.join(output_dir, f"profile-{os.getpid()}-{stamp}.collapsed")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(sampler.collapsed())
+        logger.info("Wrote %s-sample profile to %s", sampler.sample_count, path)
+
+    def _handler(_signum, _frame) -> None:
+        threading.Thread(target=_write_profile, name="signal-profiler", daemon=True).start()
+
+    try:
+        signal.signal(signum, _handler)
+    except ValueError:  # not on the main thread
+        logger.warning("Cannot install profiling signal handler outside the main thread")
+        return False
+    return True
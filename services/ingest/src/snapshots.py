@@ -0,0 +1,201 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import duckdb
+
+from .entities import news_item_id_for, rebuild_entity_rollups
+from .store import connect_duckdb
+
+logger = logging.getLogger("ingest.snapshots")
+
+SNAPSHOT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+MANIFEST_FILE = "manifest.json"
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _parquet_pattern(source_dir: str, table: str) -> Optional[str]:
+    """Glob for a table's Parquet files, or None when the export wrote no rows for it."""
+    pattern = os.path.join(source_dir, table, "**", "*.parquet")
+    return pattern if glob.glob(pattern, recursive=True) else None
+
+
+def default_snapshot_name() -> str:
+    return datetime.now(timezone.utc).strftime("rss-%Y%m%dT%H%M%SZ")
+
+
+def resolve_snapshot_path(root: str, name: str) -> str:
+    if not SNAPSHOT_NAME_PATTERN.fullmatch(name):
+        raise ValueError(f"Invalid snapshot name: {name!r}")
+    return os.path.join(root, name)
+
+
+def export_snapshot(
+    conn: duckdb.DuckDBPyConnection,
+    target_dir: str,
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Dict[str, object]:
+    """Write `rss_items` and `entity_links` to month-partitioned, zstd Parquet under `target_dir`.
+
+    DuckDB's `COPY` reads from a consistent snapshot of the table, so ingest keeps inserting
+    while the export runs.
+    """
+    clauses: List[str] = []
+    if since:
+        clauses.append(f"published_at >= TIMESTAMP {_quote(since.isoformat())}")
+    if until:
+        clauses.append(f"published_at < TIMESTAMP {_quote(until.isoformat())}")
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    os.makedirs(target_dir, exist_ok=True)
+    rows = conn.execute(
+        f"""
+        COPY (
+            SELECT
+                source,
+                title,
+                url,
+                published_at,
+                COALESCE(strftime(published_at, '%Y-%m'), 'unknown') AS month
+            FROM rss_items
+            {where}
+        ) TO {_quote(os.path.join(target_dir, "rss_items"))}
+        (FORMAT PARQUET, COMPRESSION ZSTD, PARTITION_BY (month), OVERWRITE_OR_IGNORE)
+        """
+    ).fetchone()[0]
+    link_where = ""
+    if where:
+        # Links belong to the exported items, whenever they were tagged. Their ids are derived
+        # from the url in Python, and one joined string binds far faster than a list parameter.
+        news_ids = [news_item_id_for(row[0]) for row in conn.execute(f"SELECT url FROM rss_items {where}").fetchall()]
+        conn.execute(
+            "CREATE OR REPLACE TEMP TABLE snapshot_news_ids AS SELECT unnest(string_split(?, ',')) AS news_id",
+            [",".join(news_ids)],
+        )
+        link_where = "WHERE news_id IN (SELECT news_id FROM snapshot_news_ids)"
+    link_rows = conn.execute(
+        f"""
+        COPY (
+            SELECT
+                news_id,
+                entity_type,
+                entity_id,
+                confidence,
+                linked_at,
+                strftime(linked_at, '%Y-%m') AS month
+            FROM entity_links
+            {link_where}
+        ) TO {_quote(os.path.join(target_dir, "entity_links"))}
+        (FORMAT PARQUET, COMPRESSION ZSTD, PARTITION_BY (month), OVERWRITE_OR_IGNORE)
+        """
+    ).fetchone()[0]
+    if where:
+        conn.execute("DROP TABLE snapshot_news_ids")
+
+    manifest = {
+        "tables": {"rss_items": rows, "entity_links": link_rows},
+        "since": since.isoformat() if since else None,
+        "until": until.isoformat() if until else None,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(target_dir, MANIFEST_FILE), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+    logger.info("Exported %s rss_items and %s entity_links rows to %s", rows, link_rows, target_dir)
+    return manifest
+
+
+def import_snapshot(conn: duckdb.DuckDBPyConnection, source_dir: str) -> Dict[str, int]:
+    """Load a snapshot written by `export_snapshot`, replacing rows with matching keys."""
+    if not os.path.isdir(os.path.join(source_dir, "rss_items")):
+        raise FileNotFoundError(f"No rss_items snapshot under {source_dir}")
+    # A ranged export that matched nothing leaves the directory without Parquet files.
+    pattern = _parquet_pattern(source_dir, "rss_items")
+    # Snapshots taken before tags were kept locally have no entity_links directory.
+    has_links = os.path.isdir(os.path.join(source_dir, "entity_links"))
+    links_pattern = _parquet_pattern(source_dir, "entity_links") if has_links else None
+    imported = {"rss_items": 0}
+    if has_links:
+        imported["entity_links"] = 0
+
+    # Items and their links land together or not at all.
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        if pattern is not None:
+            # Counts are rows loaded from the snapshot, including rows that replaced existing ones.
+            imported["rss_items"] = conn.execute(
+                f"""
+                INSERT OR REPLACE INTO rss_items (source, title, url, published_at)
+                SELECT source, title, url, published_at
+                FROM read_parquet({_quote(pattern)}, hive_partitioning = true)
+                """
+            ).fetchone()[0]
+        if links_pattern is not None:
+            # Items present in the snapshot take its links wholesale, as in `record_entity_links`.
+            conn.execute(
+                f"""
+                CREATE TEMP TABLE snapshot_links AS
+                SELECT news_id, entity_type, entity_id, confidence, linked_at
+                FROM read_parquet({_quote(links_pattern)}, hive_partitioning = true)
+                """
+            )
+            conn.execute("DELETE FROM entity_links WHERE news_id IN (SELECT news_id FROM snapshot_links)")
+            imported["entity_links"] = conn.execute(
+                "INSERT INTO entity_links SELECT * FROM snapshot_links"
+            ).fetchone()[0]
+            conn.execute("DROP TABLE snapshot_links")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if links_pattern is not None:
+        rebuild_entity_rollups(conn)
+    logger.info("Imported snapshot %s (%s)", source_dir, imported)
+    return imported
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .config import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(prog="ingest-snapshot", description="Export or import rss_items/entity_links Parquet snapshots")
+    parser.add_argument("--duckdb-path", default=settings.duckdb_path)
+    parser.add_argument("--snapshot-dir", default=settings.snapshot_dir)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export")
+    export_parser.add_argument("--name", default=None)
+    export_parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    export_parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+
+    import_parser = commands.add_parser("import")
+    import_parser.add_argument("name")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    conn = connect_duckdb(args.duckdb_path)
+    try:
+        if args.command == "export":
+            path = resolve_snapshot_path(args.snapshot_dir, args.name or default_snapshot_name())
+            result = export_snapshot(conn, path, since=args.since, until=args.until)
+            result["path"] = path
+        else:
+            path = resolve_snapshot_path(args.snapshot_dir, args.name)
+            result = {"path": path, "imported": import_snapshot(conn, path)}
+    finally:
+        conn.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+
+import duckdb
+
+
+def ensure_duckdb_schema(conn: duckdb.DuckDBPyConnection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rss_items (
+            source TEXT,
+            title TEXT,
+            url TEXT PRIMARY KEY,
+            published_at TIMESTAMP
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rss_fingerprints (
+            url TEXT PRIMARY KEY,
+            simhash UBIGINT,
+            band0 USMALLINT,
+            band1 USMALLINT,
+            band2 USMALLINT,
+            band3 USMALLINT,
+            config_key TEXT,
+            tag_result TEXT,
+            canonical_url TEXT,
+            seen_at TIMESTAMP
+        )
+        """
+    )
+    # One single-column index per LSH band: lookups probe each band separately (see dedup.py).
+    for index in range(4):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS rss_fingerprints_band{index} ON rss_fingerprints (band{index})")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS isrc_ledger (
+            isrc TEXT PRIMARY KEY,
+            content_hash TEXT,
+            upserted_at TIMESTAMP
+        )
+        """
+    )
+    # Composite primary keys crash DuckDB 1.1 once rows are deleted from them, so the entity
+    # tables stay unindexed apart from the per-item state keyed on news_id.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entity_links (
+            news_id TEXT,
+            entity_type TEXT,
+            entity_id TEXT,
+            confidence DOUBLE,
+            linked_at TIMESTAMP
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entity_link_items (
+            news_id TEXT PRIMARY KEY,
+            links_hash TEXT,
+            linked_at TIMESTAMP
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entity_mentions_daily (
+            entity_type TEXT,
+            entity_id TEXT,
+            day DATE,
+            mentions BIGINT,
+            confidence_sum DOUBLE
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entity_co_mentions_daily (
+            day DATE,
+            left_type TEXT,
+            left_id TEXT,
+            right_type TEXT,
+            right_id TEXT,
+            mentions BIGINT
+        )
+        """
+    )
+
+
+def connect_duckdb(path: str) -> duckdb.DuckDBPyConnection:
+    """Open the ingest DuckDB file, creating its directory and tables on first use."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = duckdb.connect(path)
+    ensure_duckdb_schema(conn)
+    return conn
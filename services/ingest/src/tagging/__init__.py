@@ -1,4 +1,17 @@
 from .matcher import TaggingConfig, TaggingStoplist, match_entities
 from .embeddings import EmbeddingClient, get_embedding_client
+from .backends import EmbeddingBackend, check_backend, load_backend
+from .compiled import CompiledDictionary, compile_dictionary
 
-__all__ = ["TaggingConfig", "TaggingStoplist", "match_entities", "EmbeddingClient", "get_embedding_client"]
+__all__ = [
+    "TaggingConfig",
+    "TaggingStoplist",
+    "match_entities",
+    "EmbeddingClient",
+    "get_embedding_client",
+    "EmbeddingBackend",
+    "check_backend",
+    "load_backend",
+    "CompiledDictionary",
+    "compile_dictionary",
+]
@@ -0,0 +1,301 @@
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("ingest.tagging")
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+_backends: Dict[Tuple[str, str, Optional[str], int], "EmbeddingBackend"] = {}
+_backends_lock = threading.Lock()
+
+# Fixed accuracy set: headline-shaped text plus the kinds of labels the matcher embeds.
+EVALUATION_TEXTS: Tuple[str, ...] = (
+    "Billie Eilish announces world tour dates for next spring",
+    "Billie Eilish",
+    "Kendrick Lamar wins Pulitzer Prize for Music",
+    "Kendrick Lamar",
+    "Taylor Swift re-records Speak Now with vault tracks",
+    "Taylor Swift",
+    "Speak Now (Taylor's Version)",
+    "Radiohead reissue OK Computer for its anniversary",
+    "Radiohead",
+    "OK Computer",
+    "Beyoncé tops the charts with Cowboy Carter",
+    "Beyoncé",
+    "Cowboy Carter",
+    "Daft Punk share unreleased demo from Random Access Memories sessions",
+    "Daft Punk",
+    "Random Access Memories",
+    "Bad Bunny headlines Coachella on Friday night",
+    "Bad Bunny",
+    "Coachella lineup revealed with surprise reunion",
+    "Adele extends Las Vegas residency through the summer",
+    "Adele",
+    "Someone Like You",
+    "Fleetwood Mac catalogue sale tops $100 million",
+    "Fleetwood Mac",
+    "Rumours",
+    "Dreams",
+    "Publisher signs songwriter behind Flowers to new deal",
+    "Flowers",
+    "Miley Cyrus",
+    "Streaming royalties rise as vinyl sales hit a 30-year high",
+    "Vinyl pressing plants struggle to meet demand",
+    "Metallica remaster Master of Puppets for special edition",
+    "Metallica",
+    "Master of Puppets",
+    "Jazz pianist records live album at the Village Vanguard",
+    "Live at the Village Vanguard",
+    "Bohemian Rhapsody passes two billion streams",
+    "Queen",
+    "Bohemian Rhapsody",
+    "Drake and The Weeknd collaboration leaks online",
+    "The Weeknd",
+    "Blinding Lights",
+    "Orchestra premieres new symphony inspired by film scores",
+    "Symphony No. 9",
+    "Ludwig van Beethoven",
+    "Label drops surprise EP from indie band at midnight",
+    "Rosalía wins Latin Grammy for Motomami",
+    "Motomami",
+)
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into vectors; `EmbeddingClient` handles caching and batching around it."""
+
+    name = "base"
+    threads = 0
+
+    @abstractmethod
+    def encode(self, texts: Sequence[str]) -> List[List[float]]:
+        ...
+
+
+class ModelBackend(EmbeddingBackend):
+    """Wraps a `SentenceTransformer`-compatible model (anything with `encode(list)`)."""
+
+    def __init__(self, model: object, name: str = "torch", threads: int = 0) -> None:
+        self.model = model
+        self.name = name
+        self.threads = threads
+
+    def encode(self, texts: Sequence[str]) -> List[List[float]]:
+        return [vector.tolist() for vector in self.model.encode(list(texts))]
+
+
+class OnnxBackend(EmbeddingBackend):
+    """Mean-pooled, L2-normalised sentence embeddings from an exported transformer on ONNX Runtime.
+
+    `model_path` is a `.onnx` file (e.g. from `optimum-cli export onnx --task feature-extraction`)
+    with the model's `tokenizer.json` next to it. Each call pads only to its longest text.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_path: str, threads: int = 0, max_length: int = 256) -> None:
+        import numpy
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self._numpy = numpy
+        self.threads = threads
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.inter_op_num_threads = 1
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self._session = onnxruntime.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {node.name for node in self._session.get_inputs()}
+        self._tokenizer = Tokenizer.from_file(os.path.join(os.path.dirname(model_path) or ".", "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length)
+        self._tokenizer.enable_padding()
+
+    def encode(self, texts: Sequence[str]) -> List[List[float]]:
+        np = self._numpy
+        encodings = self._tokenizer.encode_batch(list(texts))
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._inputs:
+            feeds["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+        hidden = self._session.run(None, feeds)[0]
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
+
+
+def _load_sentence_transformer(model_name: str, threads: int, quantize: bool) -> ModelBackend:
+    # sentence-transformers pulls in torch, so it is only imported once a model is needed.
+    from sentence_transformers import SentenceTransformer
+
+    if threads > 0:
+        import torch
+
+        torch.set_num_threads(threads)
+    model = SentenceTransformer(model_name, device="cpu")
+    if not quantize:
+        return ModelBackend(model, name="torch", threads=threads)
+    import torch
+
+    # Dynamic int8 quantization of the Linear layers, which dominate encoder cost on CPU.
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return ModelBackend(model, name="torch-int8", threads=threads)
+
+
+def load_backend(
+    kind: str,
+    model_name: str,
+    *,
+    threads: int = 0,
+    onnx_path: Optional[str] = None
+) -> Optional[EmbeddingBackend]:
+    """Load (once per process and configuration) the backend for `kind`; None if unavailable."""
+    if kind not in BACKENDS:
+        logger.warning("Unknown embedding backend %s; expected one of %s", kind, ", ".join(BACKENDS))
+        return None
+    key = (kind, model_name, onnx_path, threads)
+    with _backends_lock:
+        if key in _backends:
+            return _backends[key]
+    try:  # pragma: no cover - optional dependency
+        if kind == "onnx":
+            if not onnx_path:
+                logger.warning("Embedding backend onnx needs INGEST_TAGGING_EMBEDDING_ONNX_PATH")
+                return None
+            backend: EmbeddingBackend = OnnxBackend(onnx_path, threads=threads)
+        else:
+            backend = _load_sentence_transformer(model_name, threads, quantize=kind == "torch-int8")
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        logger.info("Embedding backend %s not installed (%s); embedding support disabled", kind, exc)
+        return None
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("Failed to load embedding backend %s for %s: %s", kind, model_name, exc)
+        return None
+    logger.info("Loaded embedding backend %s for %s", kind, onnx_path or model_name)
+    with _backends_lock:
+        # Failures are not cached, so a later client can retry the load.
+        return _backends.setdefault(key, backend)
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _nearest_neighbours(vectors: Sequence[Sequence[float]]) -> List[int]:
+    neighbours = []
+    for index, vector in enumerate(vectors):
+        scores = [(_cosine(vector, other), other_index) for other_index, other in enumerate(vectors) if other_index != index]
+        neighbours.append(max(scores)[1])
+    return neighbours
+
+
+def _throughput(backend: EmbeddingBackend, texts: Sequence[str], batch_size: int, rounds: int) -> float:
+    backend.encode(texts[:batch_size])
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for start in range(0, len(texts), batch_size):
+            backend.encode(texts[start : start + batch_size])
+    return rounds * len(texts) / (time.perf_counter() - started)
+
+
+def check_backend(
+    reference: EmbeddingBackend,
+    candidate: EmbeddingBackend,
+    texts: Sequence[str] = EVALUATION_TEXTS,
+    *,
+    batch_size: int = 32,
+    rounds: int = 3
+) -> Dict[str, object]:
+    """Compare `candidate` against `reference` on `texts`: vector agreement and throughput."""
+    expected = reference.encode(texts)
+    actual = candidate.encode(texts)
+    cosines = [_cosine(a, b) for a, b in zip(expected, actual)]
+    agreement = sum(
+        1 for left, right in zip(_nearest_neighbours(expected), _nearest_neighbours(actual)) if left == right
+    )
+    report: Dict[str, object] = {
+        "texts": len(texts),
+        "mean_cosine": round(sum(cosines) / len(cosines), 6),
+        "min_cosine": round(min(cosines), 6),
+        "neighbour_agreement": round(agreement / len(texts), 4),
+    }
+    for label, backend in (("reference", reference), ("candidate", candidate)):
+        rate = _throughput(backend, texts, batch_size, rounds)
+        report[f"{label}_backend"] = backend.name
+        report[f"{label}_texts_per_s"] = round(rate, 1)
+        if backend.threads:
+            report[f"{label}_texts_per_s_per_thread"] = round(rate / backend.threads, 1)
+    report["speedup"] = round(report["candidate_texts_per_s"] / report["reference_texts_per_s"], 2)
+    return report
+
+
+def quantize_onnx(source: str, target: str) -> None:
+    """Write a dynamically int8-quantized copy of an ONNX model (and its tokenizer) to `target`."""
+    import shutil
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    tokenizer = os.path.join(os.path.dirname(source) or ".", "tokenizer.json")
+    target_tokenizer = os.path.join(os.path.dirname(target) or ".", "tokenizer.json")
+    if os.path.exists(tokenizer) and not os.path.exists(target_tokenizer):
+        shutil.copyfile(tokenizer, target_tokenizer)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="ingest-embeddings", description="Embedding backend tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = commands.add_parser("check", help="Compare a backend against the torch reference model")
+    check_parser.add_argument("--model", default=None, help="Defaults to INGEST_TAGGING_EMBEDDINGS_MODEL")
+    check_parser.add_argument("--backend", choices=BACKENDS, required=True)
+    check_parser.add_argument("--onnx-path")
+    check_parser.add_argument("--threads", type=int, default=1)
+    check_parser.add_argument("--batch-size", type=int, default=32)
+    check_parser.add_argument("--min-cosine", type=float, default=0.98)
+    check_parser.add_argument("--min-agreement", type=float, default=0.95)
+
+    quantize_parser = commands.add_parser("quantize-onnx", help="Write an int8 copy of an ONNX model")
+    quantize_parser.add_argument("source")
+    quantize_parser.add_argument("target")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "quantize-onnx":
+        quantize_onnx(args.source, args.target)
+        print(json.dumps({"source": args.source, "target": args.target}))
+        return
+
+    model_name = args.model
+    if model_name is None:
+        from ..config import get_settings
+
+        model_name = get_settings().tagging_embeddings_model
+    reference = load_backend("torch", model_name, threads=args.threads)
+    candidate = load_backend(args.backend, model_name, threads=args.threads, onnx_path=args.onnx_path)
+    if reference is None or candidate is None:
+        parser.error("could not load the reference or candidate backend")
+    report = check_backend(reference, candidate, batch_size=args.batch_size)
+    report["passed"] = report["min_cosine"] >= args.min_cosine and report["neighbour_agreement"] >= args.min_agreement
+    print(json.dumps(report, indent=2))
+    if not report["passed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from .embeddings import EmbeddingClient
+from .matcher import EntityCandidate, _prepare_candidates
+
+logger = logging.getLogger("ingest.tagging")
+
+MAGIC = b"OMSTAG01"
+FORMAT_VERSION = 1
+ENTITY_TYPES = ("artist", "work", "recording")
+_ALIGN = 8
+
+# File layout (little-endian):
+#   MAGIC | u32 header length | JSON header | padding | 8-byte aligned array sections
+# The header maps each entity type to (offset, length) pairs, relative to the first aligned
+# byte after the header, for its label/normalized string blobs, their uint64 offset arrays,
+# uint32 token ids (indices into a shared vocabulary) with per-candidate uint64 offsets, and
+# an optional float32 embedding matrix of `dim` columns. The header also names the model and
+# backend that produced the embeddings; vectors are only comparable within the same pair.
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def add(self, payload: bytes) -> List[int]:
+        padding = (-self.size) % _ALIGN
+        if padding:
+            self.chunks.append(b"\0" * padding)
+            self.size += padding
+        offset = self.size
+        self.chunks.append(payload)
+        self.size += len(payload)
+        return [offset, len(payload)]
+
+
+def _string_table(writer: _Writer, values: Sequence[str]) -> Dict[str, List[int]]:
+    offsets = array("Q", [0])
+    blob = bytearray()
+    for value in values:
+        blob.extend(value.encode("utf-8"))
+        offsets.append(len(blob))
+    return {"blob": writer.add(bytes(blob)), "offsets": writer.add(offsets.tobytes())}
+
+
+def compile_dictionary(
+    path: str,
+    *,
+    artists: Sequence[str],
+    works: Sequence[str],
+    recordings: Sequence[str],
+    embedding_client: Optional[EmbeddingClient] = None
+) -> Dict[str, int]:
+    """Normalize, tokenize and (optionally) embed a dictionary into a flat snapshot file."""
+    writer = _Writer()
+    vocabulary: Dict[str, int] = {}
+    sections: Dict[str, Dict[str, object]] = {}
+    dim = 0
+    embedding_model: Optional[str] = None
+    embedding_backend: Optional[str] = None
+    counts: Dict[str, int] = {}
+
+    for entity_type, values in zip(ENTITY_TYPES, (artists, works, recordings)):
+        candidates = _prepare_candidates(values)
+        token_ids = array("I")
+        token_offsets = array("Q", [0])
+        for candidate in candidates:
+            for token in candidate.tokens:
+                token_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+            token_offsets.append(len(token_ids))
+
+        section: Dict[str, object] = {
+            "count": len(candidates),
+            "labels": _string_table(writer, [candidate.label for candidate in candidates]),
+            "normalized": _string_table(writer, [candidate.normalized for candidate in candidates]),
+            "token_ids": writer.add(token_ids.tobytes()),
+            "token_offsets": writer.add(token_offsets.tobytes()),
+            "embeddings": None,
+        }
+        if embedding_client is not None and embedding_client.enabled and candidates:
+            vectors = embedding_client.encode_batch([candidate.normalized for candidate in candidates])
+            dim = len(vectors[0])
+            embedding_model = embedding_client.model_name
+            embedding_backend = embedding_client.backend
+            matrix = array("f")
+            for vector in vectors:
+                matrix.extend(vector)
+            section["embeddings"] = writer.add(matrix.tobytes())
+        sections[entity_type] = section
+        counts[entity_type] = len(candidates)
+
+    vocab_words = sorted(vocabulary, key=vocabulary.__getitem__)
+    header = {
+        "version": FORMAT_VERSION,
+        "dim": dim,
+        "embedding_model": embedding_model,
+        "embedding_backend": embedding_backend,
+        "vocabulary": _string_table(writer, vocab_words),
+        "vocabulary_size": len(vocab_words),
+        "sections": sections,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes
+    prefix += b"\0" * ((-len(prefix)) % _ALIGN)
+    tmp_path = f"{path}.tmp"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(tmp_path, "wb") as handle:
+        handle.write(prefix)
+        for chunk in writer.chunks:
+            handle.write(chunk)
+    os.replace(tmp_path, path)
+    logger.info("Compiled tagging dictionary %s (%s)", path, counts)
+    return counts
+
+
+class _StringTable:
+    def __init__(self, data: memoryview, spec: Dict[str, List[int]], count: int) -> None:
+        blob_offset, blob_length = spec["blob"]
+        offsets_offset, offsets_length = spec["offsets"]
+        self._blob = data[blob_offset : blob_offset + blob_length]
+        self._offsets = data[offsets_offset : offsets_offset + offsets_length].cast("Q")
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        return str(self._blob[self._offsets[index] : self._offsets[index + 1]], "utf-8")
+
+
+class MappedCandidates(Sequence[EntityCandidate]):
+    """Read-only candidate list decoded on demand from a memory-mapped snapshot."""
+
+    def __init__(
+        self,
+        data: memoryview,
+        section: Dict[str, object],
+        vocabulary: Sequence[str],
+        dim: int
+    ) -> None:
+        self._count = int(section["count"])
+        self._labels = _StringTable(data, section["labels"], self._count)
+        self._normalized = _StringTable(data, section["normalized"], self._count)
+        ids_offset, ids_length = section["token_ids"]
+        offsets_offset, offsets_length = section["token_offsets"]
+        self._token_ids = data[ids_offset : ids_offset + ids_length].cast("I")
+        self._token_offsets = data[offsets_offset : offsets_offset + offsets_length].cast("Q")
+        self._vocabulary = vocabulary
+        self._dim = dim
+        self._embeddings = None
+        if section.get("embeddings") and dim:
+            emb_offset, emb_length = section["embeddings"]
+            self._embeddings = data[emb_offset : emb_offset + emb_length].cast("f")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> EntityCandidate:  # type: ignore[override]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        start, end = self._token_offsets[index], self._token_offsets[index + 1]
+        embedding = None
+        if self._embeddings is not None:
+            embedding = self._embeddings[index * self._dim : (index + 1) * self._dim]
+        return EntityCandidate(
+            label=self._labels[index],
+            normalized=self._normalized[index],
+            tokens=[self._vocabulary[token_id] for token_id in self._token_ids[start:end]],
+            embedding=embedding,
+        )
+
+    def __iter__(self) -> Iterator[EntityCandidate]:
+        # Hot path: the matcher walks every candidate per item, so skip per-index bounds checks.
+        label_blob, label_offsets = self._labels._blob, self._labels._offsets
+        normalized_blob, normalized_offsets = self._normalized._blob, self._normalized._offsets
+        token_ids, token_offsets = self._token_ids, self._token_offsets
+        vocabulary, embeddings, dim = self._vocabulary, self._embeddings, self._dim
+        for index in range(self._count):
+            yield EntityCandidate(
+                label=str(label_blob[label_offsets[index] : label_offsets[index + 1]], "utf-8"),
+                normalized=str(normalized_blob[normalized_offsets[index] : normalized_offsets[index + 1]], "utf-8"),
+                tokens=[vocabulary[token_id] for token_id in token_ids[token_offsets[index] : token_offsets[index + 1]]],
+                embedding=embeddings[index * dim : (index + 1) * dim] if embeddings is not None else None,
+            )
+
+
+class CompiledDictionary:
+    """A memory-mapped dictionary snapshot shared through the page cache by every worker."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as handle:
+            stat = os.fstat(handle.fileno())
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self.fingerprint = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        raw = memoryview(self._mmap)
+        if bytes(raw[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a compiled tagging dictionary")
+        (header_length,) = struct.unpack_from("<I", raw, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        header = json.loads(bytes(raw[header_start : header_start + header_length]))
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported dictionary version {header.get('version')} in {path}")
+        data_start = header_start + header_length
+        data_start += (-data_start) % _ALIGN
+        data = raw[data_start:]
+
+        self.dim = int(header.get("dim") or 0)
+        self.embedding_model: Optional[str] = header.get("embedding_model")
+        # Dictionaries compiled before backends were selectable always used torch.
+        self.embedding_backend: Optional[str] = header.get("embedding_backend") or (
+            "torch" if self.dim else None
+        )
+        self._data = data
+        self._sections = header["sections"]
+        vocabulary_table = _StringTable(data, header["vocabulary"], int(header["vocabulary_size"]))
+        # The vocabulary is small next to the label tables, so it is decoded once per worker.
+        self.vocabulary = [vocabulary_table[index] for index in range(len(vocabulary_table))]
+        self._map_candidates()
+
+    def _map_candidates(self) -> None:
+        self._candidates = {
+            entity_type: MappedCandidates(self._data, self._sections[entity_type], self.vocabulary, self.dim)
+            for entity_type in ENTITY_TYPES
+        }
+
+    def drop_embeddings(self) -> None:
+        """Stop serving the precomputed vectors, so candidates are embedded at match time instead."""
+        self.dim = 0
+        self._map_candidates()
+
+    def candidates(self, entity_type: str) -> MappedCandidates:
+        return self._candidates[entity_type]
+
+    @property
+    def has_embeddings(self) -> bool:
+        return self.dim > 0
+
+    def counts(self) -> Dict[str, int]:
+        return {entity_type: len(candidates) for entity_type, candidates in self._candidates.items()}
+
+
+def _read_labels(path: Optional[str]) -> List[str]:
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as handle:
+        return [line.strip() for line in handle if line.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="ingest-compile-dictionary",
+        description="Compile newline-delimited label files into a memory-mappable tagging dictionary",
+    )
+    parser.add_argument("--artists")
+    parser.add_argument("--works")
+    parser.add_argument("--recordings")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--embeddings", action="store_true", help="Embed labels with the configured model")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    embedding_client = None
+    if args.embeddings:
+        from ..config import get_settings
+
+        settings = get_settings()
+        embedding_client = EmbeddingClient(
+            settings.tagging_embeddings_model,
+            cache_ttl=0,
+            redis_url=None,
+            backend=settings.tagging_embedding_backend,
+            threads=settings.tagging_embedding_threads,
+            onnx_path=settings.tagging_embedding_onnx_path,
+            batch_size=settings.tagging_embedding_batch_size,
+        )
+        if not embedding_client.enabled:
+            parser.error("--embeddings requested but the embedding model could not be loaded")
+
+    counts = compile_dictionary(
+        args.output,
+        artists=_read_labels(args.artists),
+        works=_read_labels(args.works),
+        recordings=_read_labels(args.recordings),
+        embedding_client=embedding_client,
+    )
+    print(json.dumps({"path": args.output, "counts": counts}))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,69 +2,144 @@ import hashlib
 import json
 import logging
 import math
-from functools import lru_cache
-from typing import Dict, List, Optional, Sequence
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import redis
 
-try:  # pragma: no cover - optional dependency
-    from sentence_transformers import SentenceTransformer
-except ImportError:  # pragma: no cover - optional dependency
-    SentenceTransformer = None  # type: ignore
+from ..metrics import EMBEDDING_CACHE, stage
+from .backends import EmbeddingBackend, ModelBackend, load_backend
 
 logger = logging.getLogger("ingest.tagging")
 
+_clients: Dict[Tuple[object, ...], "EmbeddingClient"] = {}
+_clients_lock = threading.Lock()
+
 
 def _hash_key(value: str) -> str:
     return hashlib.sha1(value.encode("utf-8")).hexdigest()
 
 
 class EmbeddingClient:
-    def __init__(self, model_name: str, cache_ttl: int, redis_url: Optional[str]) -> None:
+    def __init__(
+        self,
+        model_name: str,
+        cache_ttl: int,
+        redis_url: Optional[str],
+        model: Optional[object] = None,
+        *,
+        backend: str = "torch",
+        threads: int = 0,
+        onnx_path: Optional[str] = None,
+        batch_size: int = 64
+    ) -> None:
         self.cache_ttl = cache_ttl
         self.model_name = model_name
+        self.batch_size = max(1, batch_size)
         self._memory: Dict[str, List[float]] = {}
         self._redis = redis.from_url(redis_url) if redis_url else None
-        self._model = None
-        self.enabled = False
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+
+        # Pre-built models (e.g. deterministic fakes in benchmarks) skip the download.
+        if model is not None:
+            self._backend: Optional[EmbeddingBackend] = ModelBackend(model, threads=threads)
+        else:
+            started = time.perf_counter()
+            self._backend = load_backend(backend, model_name, threads=threads, onnx_path=onnx_path)
+            self.load_seconds = time.perf_counter() - started
+        self.backend = self._backend.name if self._backend is not None else backend
+        # Vectors from approximate backends must not be served to reference-model clients.
+        self._key_prefix = "" if self.backend == "torch" else f"{self.backend}:{model_name}:"
+        self.enabled = self._backend is not None
 
-        if SentenceTransformer is None:
-            logger.info("SentenceTransformer not installed; embedding support disabled")
-            return
+    def warm_up(self) -> Optional[float]:
+        """Run a throwaway batch so lazy model initialisation is paid before the first request."""
+        if not self.enabled or self._backend is None:
+            return None
+        started = time.perf_counter()
+        self._backend.encode(["warm up", "omnisonic ingest"])
+        self.warmup_seconds = time.perf_counter() - started
+        return self.warmup_seconds
 
-        try:
-            self._model = SentenceTransformer(model_name)
-            self.enabled = True
-            logger.info("Loaded embedding model %s", model_name)
-        except Exception as exc:  # pragma: no cover - defensive
-            logger.warning("Failed to load embedding model %s: %s", model_name, exc)
-            self.enabled = False
+    def status(self) -> Dict[str, object]:
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "threads": self._backend.threads if self._backend is not None else None,
+            "batch_size": self.batch_size,
+            "loaded": self.enabled,
+            "load_seconds": self.load_seconds,
+            "warm": self.warmup_seconds is not None,
+            "warmup_seconds": self.warmup_seconds,
+            "memory_cache_entries": len(self._memory),
+            "redis_cache": self._redis is not None,
+        }
 
     def embed(self, text: str) -> Optional[List[float]]:
-        if not self.enabled or not text.strip():
-            return None
-        key = _hash_key(text.strip().lower())
-        if key in self._memory:
-            return self._memory[key]
-        if self._redis is not None:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Embed `texts`, encoding every cache miss together in length-sorted batches."""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        if not self.enabled or self._backend is None:
+            return results
+        misses: Dict[str, Tuple[str, List[int]]] = {}
+        for index, text in enumerate(texts):
+            if not text.strip():
+                continue
+            key = self._key_prefix + _hash_key(text.strip().lower())
+            if key in self._memory:
+                EMBEDDING_CACHE.inc("memory_hit")
+                results[index] = self._memory[key]
+            else:
+                misses.setdefault(key, (text, []))[1].append(index)
+        if misses and self._redis is not None:
+            keys = list(misses)
             try:
-                cached = self._redis.get(key)
-                if cached:
-                    vector = json.loads(cached)
-                    self._memory[key] = vector
-                    return vector
+                cached = self._redis.mget(keys)
             except redis.RedisError as exc:  # pragma: no cover - network
                 logger.debug("Redis read failed for embedding cache: %s", exc)
-        if self._model is None:
-            return None
-        vector = self._model.encode([text])[0].tolist()
-        self._memory[key] = vector
-        if self._redis is not None:
-            try:
-                self._redis.setex(key, self.cache_ttl, json.dumps(vector))
-            except redis.RedisError as exc:  # pragma: no cover - network
-                logger.debug("Redis write failed for embedding cache: %s", exc)
-        return vector
+                cached = [None] * len(keys)
+            for key, payload in zip(keys, cached):
+                if payload:
+                    vector = json.loads(payload)
+                    self._memory[key] = vector
+                    EMBEDDING_CACHE.inc("redis_hit")
+                    for index in misses.pop(key)[1]:
+                        results[index] = vector
+        if not misses:
+            return results
+
+        # Texts of similar length share a batch, so each one pads only to its own longest text.
+        pending = sorted(misses.items(), key=lambda item: len(item[1][0]))
+        EMBEDDING_CACHE.inc("miss", amount=len(pending))
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start : start + self.batch_size]
+            with stage("embedding_encode"):
+                vectors = self._backend.encode([text for _key, (text, _indices) in batch])
+            for (key, (_text, indices)), vector in zip(batch, vectors):
+                self._memory[key] = vector
+                for index in indices:
+                    results[index] = vector
+                if self._redis is not None:
+                    try:
+                        self._redis.setex(key, self.cache_ttl, json.dumps(vector))
+                    except redis.RedisError as exc:  # pragma: no cover - network
+                        logger.debug("Redis write failed for embedding cache: %s", exc)
+        return results
+
+    def encode_batch(self, texts: Sequence[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """Encode many texts straight through the backend, bypassing the caches (offline builds)."""
+        if not self.enabled or self._backend is None:
+            return []
+        batch_size = batch_size or self.batch_size
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), batch_size):
+            with stage("embedding_encode"):
+                vectors.extend(self._backend.encode(list(texts[start : start + batch_size])))
+        return vectors
 
     @staticmethod
     def similarity(a: Optional[Sequence[float]], b: Optional[Sequence[float]]) -> float:
@@ -78,6 +153,33 @@ class EmbeddingClient:
         return dot / (norm_a * norm_b)
 
 
-@lru_cache(maxsize=1)
-def get_embedding_client(model_name: str, cache_ttl: int, redis_url: Optional[str]) -> EmbeddingClient:
-    return EmbeddingClient(model_name=model_name, cache_ttl=cache_ttl, redis_url=redis_url)
+def get_embedding_client(
+    model_name: str,
+    cache_ttl: int,
+    redis_url: Optional[str],
+    *,
+    backend: str = "torch",
+    threads: int = 0,
+    onnx_path: Optional[str] = None,
+    batch_size: int = 64
+) -> EmbeddingClient:
+    """Return the shared client for these settings; backends are loaded once per configuration.
+
+    A client whose backend failed to load is returned but not cached, so the next call retries.
+    """
+    key = (model_name, cache_ttl, redis_url, backend, threads, onnx_path, batch_size)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = EmbeddingClient(
+                model_name=model_name,
+                cache_ttl=cache_ttl,
+                redis_url=redis_url,
+                backend=backend,
+                threads=threads,
+                onnx_path=onnx_path,
+                batch_size=batch_size,
+            )
+            if client.enabled:
+                _clients[key] = client
+        return client
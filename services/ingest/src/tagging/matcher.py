@@ -1,12 +1,17 @@
+import hashlib
 import re
 import unicodedata
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Sequence
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
 
 from thefuzz import fuzz
 
+from ..metrics import CANDIDATES_SCORED
 from .embeddings import EmbeddingClient
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .compiled import CompiledDictionary
+
 WORD_RE = re.compile(r"[\w'\-]+", re.UNICODE)
 FEATURE_PATTERN = re.compile(r"\b(feat\.?|featuring|ft\.?|vs\.?)(?=\s)", re.IGNORECASE)
 
@@ -64,6 +69,7 @@ class EntityCandidate:
     label: str
     normalized: str
     tokens: List[str]
+    embedding: Optional[Sequence[float]] = None
 
 
 @dataclass
@@ -72,6 +78,7 @@ class MatchDetail:
     confidence: float
     method: str
     snippet: Optional[str]
+    scored: int = 0
 
 
 @dataclass
@@ -83,26 +90,50 @@ class TaggingConfig:
     fuzzy_threshold: int = 70
     embedding_threshold: float = 0.7
     use_embeddings: bool = False
+    compiled: Optional["CompiledDictionary"] = None
 
     def __post_init__(self) -> None:
         self.fuzzy_threshold = max(1, min(self.fuzzy_threshold, 100))
         self.embedding_threshold = max(0.0, min(self.embedding_threshold, 1.0))
+        if self.compiled is not None:
+            # Precompiled snapshots replace the per-request label lists entirely.
+            self._artist_candidates = self.compiled.candidates("artist")
+            self._work_candidates = self.compiled.candidates("work")
+            self._recording_candidates = self.compiled.candidates("recording")
+            return
         self._artist_candidates = _prepare_candidates(self.artists)
         self._work_candidates = _prepare_candidates(self.works)
         self._recording_candidates = _prepare_candidates(self.recordings)
 
     @property
-    def artist_candidates(self) -> List[EntityCandidate]:
+    def artist_candidates(self) -> Sequence[EntityCandidate]:
         return self._artist_candidates
 
     @property
-    def work_candidates(self) -> List[EntityCandidate]:
+    def work_candidates(self) -> Sequence[EntityCandidate]:
         return self._work_candidates
 
     @property
-    def recording_candidates(self) -> List[EntityCandidate]:
+    def recording_candidates(self) -> Sequence[EntityCandidate]:
         return self._recording_candidates
 
+    def fingerprint(self) -> str:
+        """Stable key for everything that influences `match_entities` results."""
+        if getattr(self, "_fingerprint", None) is None:
+            digest = hashlib.sha1()
+            digest.update(
+                repr((self.fuzzy_threshold, self.embedding_threshold, self.use_embeddings)).encode("utf-8")
+            )
+            for values in (self.stoplist.artists, self.stoplist.works, self.stoplist.recordings):
+                digest.update(("\x1e" + "\x1f".join(_normalize(value) for value in values)).encode("utf-8"))
+            if self.compiled is not None:
+                digest.update(self.compiled.fingerprint.encode("utf-8"))
+            else:
+                for candidates in (self._artist_candidates, self._work_candidates, self._recording_candidates):
+                    digest.update(("\x1e" + "\x1f".join(candidate.label for candidate in candidates)).encode("utf-8"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
 
 def _prepare_candidates(values: Sequence[str]) -> List[EntityCandidate]:
     unique: Dict[str, EntityCandidate] = {}
@@ -136,23 +167,36 @@ def _select_candidate(
         return best
 
     threshold = config.fuzzy_threshold / 100
-    text_embedding = None
+    use_embeddings = bool(config.use_embeddings and embedding_client and embedding_client.enabled)
+    scored = 0
+    shortlist: List[Tuple[EntityCandidate, float]] = []
 
     for candidate in candidates:
         if stopcheck(candidate.label):
             continue
+        scored += 1
         lexical_score = _score_match(tokens, candidate.tokens)
         fuzzy_score = fuzz.token_set_ratio(normalized_text, candidate.normalized) / 100
         base_score = max(lexical_score, fuzzy_score)
-        if base_score < threshold:
-            continue
+        if base_score >= threshold:
+            shortlist.append((candidate, base_score))
 
+    text_embedding = None
+    label_embeddings: Dict[str, Optional[List[float]]] = {}
+    if use_embeddings and shortlist:
+        # One backend call covers the text and every shortlisted label without a stored vector.
+        labels = [candidate.normalized for candidate, _score in shortlist if candidate.embedding is None]
+        vectors = embedding_client.embed_many([raw_text, *labels])
+        text_embedding = vectors[0]
+        label_embeddings = dict(zip(labels, vectors[1:]))
+
+    for candidate, base_score in shortlist:
         method = "fuzzy"
         embedding_score: Optional[float] = None
-        if config.use_embeddings and embedding_client and embedding_client.enabled:
-            if text_embedding is None:
-                text_embedding = embedding_client.embed(raw_text)
-            candidate_embedding = embedding_client.embed(candidate.normalized)
+        if use_embeddings:
+            candidate_embedding = candidate.embedding
+            if candidate_embedding is None:
+                candidate_embedding = label_embeddings.get(candidate.normalized)
             embedding_score = EmbeddingClient.similarity(text_embedding, candidate_embedding)
             if embedding_score < config.embedding_threshold:
                 continue
@@ -164,6 +208,7 @@ def _select_candidate(
         snippet = _extract_snippet(raw_text, candidate.label)
         best = MatchDetail(value=candidate.label, confidence=confidence, method=method, snippet=snippet)
 
+    best.scored = scored
     return best
 
 
@@ -215,6 +260,10 @@ def match_entities(
         embedding_client
     )
 
+    CANDIDATES_SCORED.observe("artist", value=artist.scored)
+    CANDIDATES_SCORED.observe("work", value=work.scored)
+    CANDIDATES_SCORED.observe("recording", value=recording.scored)
+
     return {
         "artist": artist.value,
         "work": work.value,
@@ -0,0 +1,221 @@
+import asyncio
+import gzip
+import json
+import os
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from ingest import main
+from ingest.bench import StubServer, make_rss_xml
+from ingest.clickhouse import ClickHouseWriter
+from ingest.config import get_settings
+
+TITLE = "Taylor Swift announces surprise stadium tour across Europe"
+
+
+class RecordingClickHouse:
+    """HTTP stand-in that answers inserts and keeps the decoded rows per table."""
+
+    def __init__(self):
+        self.rows = {}
+        self.batches = []
+        self.status = 200
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.status != 200:
+            return httpx.Response(self.status, text="stand-in error")
+        table = request.url.params["query"].split()[2].split(".", 1)[1]
+        lines = gzip.decompress(request.content).decode("utf-8").splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.rows.setdefault(table, []).extend(rows)
+        self.batches.append(len(rows))
+        return httpx.Response(200)
+
+
+def _writer(handler, **kwargs):
+    kwargs.setdefault("flush_interval", 60)
+    transport = httpx.MockTransport(handler)
+    return ClickHouseWriter("http://clickhouse.test", "insight", transport=transport, **kwargs)
+
+
+def _rows(count, start=0):
+    return [{"id": str(index)} for index in range(start, start + count)]
+
+
+def _queued(spill_dir):
+    return sorted(name for name in os.listdir(spill_dir) if name.endswith(".jsonl.gz"))
+
+
+def test_rows_are_inserted_in_batches():
+    clickhouse = RecordingClickHouse()
+
+    async def run():
+        writer = _writer(clickhouse, batch_size=2)
+        await writer.start()
+        await writer.write("news_items", _rows(2))
+        # A full buffer is flushed without waiting for the interval.
+        for _ in range(100):
+            if clickhouse.batches:
+                break
+            await asyncio.sleep(0.01)
+        await writer.write("news_items", _rows(3, start=2))
+        await writer.stop()
+        return writer
+
+    writer = asyncio.run(run())
+    assert clickhouse.batches == [2, 2, 1]
+    assert [row["id"] for row in clickhouse.rows["news_items"]] == ["0", "1", "2", "3", "4"]
+    assert writer.inserted_rows == 5 and writer.pending == 0
+
+
+def test_failed_batches_are_spilled_and_replayed(tmp_path):
+    clickhouse = RecordingClickHouse()
+    spill_dir = str(tmp_path / "spill")
+
+    async def run():
+        writer = _writer(clickhouse, spill_dir=spill_dir)
+        await writer.start()
+        clickhouse.status = 503
+        await writer.write("news_items", _rows(3))
+        await writer.flush()
+        assert writer.spilled_batches == 1 and writer.pending == 0
+        assert len(_queued(spill_dir)) == 1
+        clickhouse.status = 200
+        await writer.flush()
+        await writer.stop()
+
+    asyncio.run(run())
+    assert [row["id"] for row in clickhouse.rows["news_items"]] == ["0", "1", "2"]
+    assert _queued(spill_dir) == []
+    assert os.listdir(os.path.join(spill_dir, f"claimed-{os.getpid()}")) == []
+
+
+def test_rejected_batches_are_dead_lettered(tmp_path):
+    clickhouse = RecordingClickHouse()
+    clickhouse.status = 400
+    spill_dir = str(tmp_path / "spill")
+
+    async def run():
+        writer = _writer(clickhouse, spill_dir=spill_dir)
+        await writer.start()
+        await writer.write("entity_links", _rows(2))
+        await writer.stop()
+        return writer
+
+    writer = asyncio.run(run())
+    assert writer.rejected_batches == 1 and writer.spilled_batches == 0
+    assert _queued(spill_dir) == []
+    rejected = os.listdir(os.path.join(spill_dir, "rejected"))
+    assert [name.split(".", 1)[0] for name in rejected] == ["entity_links"]
+
+
+def test_batches_claimed_by_a_dead_worker_are_replayed(tmp_path):
+    clickhouse = RecordingClickHouse()
+    spill_dir = tmp_path / "spill"
+    abandoned = spill_dir / "claimed-999999999"
+    abandoned.mkdir(parents=True)
+    (abandoned / "news_items.1.abcdef01.jsonl.gz").write_bytes(gzip.compress(b'{"id":"7"}'))
+
+    async def run():
+        writer = _writer(clickhouse, spill_dir=str(spill_dir))
+        await writer.start()
+        await writer.stop()
+
+    asyncio.run(run())
+    assert clickhouse.rows["news_items"] == [{"id": "7"}]
+    assert not abandoned.exists()
+
+
+def test_full_spill_directory_holds_writers(tmp_path):
+    clickhouse = RecordingClickHouse()
+    spill_dir = str(tmp_path / "spill")
+
+    async def run():
+        writer = _writer(clickhouse, spill_dir=spill_dir, max_spill_bytes=1)
+        await writer.start()
+        clickhouse.status = 503
+        await writer.write("news_items", _rows(1))
+        await writer.flush()
+        held = asyncio.create_task(writer.write("news_items", _rows(1, start=1)))
+        await asyncio.sleep(0.05)
+        assert not held.done()
+        clickhouse.status = 200
+        await writer.flush()
+        await asyncio.wait_for(held, timeout=1)
+        await writer.stop()
+
+    asyncio.run(run())
+    assert sorted(row["id"] for row in clickhouse.rows["news_items"]) == ["0", "1"]
+
+
+def test_stop_waits_for_a_flush_in_progress():
+    clickhouse = RecordingClickHouse()
+
+    async def run():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow(request: httpx.Request) -> httpx.Response:
+            started.set()
+            await release.wait()
+            return clickhouse(request)
+
+        writer = _writer(slow, batch_size=2)
+        await writer.start()
+        await writer.write("news_items", _rows(2))
+        await started.wait()
+        await writer.write("news_items", _rows(1, start=2))
+        stopping = asyncio.create_task(writer.stop())
+        await asyncio.sleep(0.05)
+        assert not stopping.done()
+        release.set()
+        await stopping
+
+    asyncio.run(run())
+    assert [row["id"] for row in clickhouse.rows["news_items"]] == ["0", "1", "2"]
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    clickhouse = RecordingClickHouse()
+    with StubServer() as stub:
+        monkeypatch.setenv("INGEST_GRAPH_API_BASE", stub.base_url)
+        monkeypatch.setenv("INGEST_DUCKDB_PATH", str(tmp_path / "ingest.duckdb"))
+        monkeypatch.setenv("INGEST_RSS_PARSE_EXECUTOR", "thread")
+        monkeypatch.setattr(
+            main,
+            "build_clickhouse_writer",
+            lambda: _writer(clickhouse, flush_interval=2.0),
+        )
+        get_settings.cache_clear()
+        yield stub, clickhouse
+    get_settings.cache_clear()
+
+
+def _ingest(client, url, artists):
+    response = client.post("/ingest/rss", json={"urls": [url], "artists": artists})
+    assert response.status_code == 200
+    return response.json()["feeds"][0]
+
+
+def test_items_are_sent_once_and_retags_are_not(service):
+    stub, clickhouse = service
+    original = stub.add_feed("wire", make_rss_xml("wire", [TITLE]))
+    # Leaving the client stops the writer, which flushes everything still buffered.
+    with TestClient(main.app) as client:
+        first = _ingest(client, original, ["Taylor Swift"])
+        _ingest(client, original, ["Taylor Swift"])
+        _ingest(client, original, ["Drake"])
+        improved = client.post("/ingest/tagging/improve", json={"artists": ["Drake"]})
+        assert improved.status_code == 200
+        copy = _ingest(client, stub.add_feed("mirror", make_rss_xml("mirror", [TITLE])), ["Drake"])
+        assert copy["duplicates"] == 1
+
+    news_id = first["tagged"][0]["news_item_id"]
+    copy_id = copy["tagged"][0]["news_item_id"]
+    assert sorted(row["id"] for row in clickhouse.rows["news_items"]) == sorted([news_id, copy_id])
+    links = clickhouse.rows["entity_links"]
+    assert {row["news_id"] for row in links} == {news_id}
+    assert [row["entity_type"] for row in links].count("artist") == 1
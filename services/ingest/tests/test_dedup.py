@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ingest.bench import StubServer, make_rss_xml
+from ingest.config import get_settings
+from ingest.dedup import (
+    find_near_duplicate,
+    find_recorded_duplicate,
+    record_fingerprint,
+    simhash,
+    update_fingerprint_tags
+)
+from ingest.store import connect_duckdb
+
+TITLE = "Taylor Swift announces surprise stadium tour across Europe"
+WINDOW = timedelta(hours=48)
+SEEN = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect_duckdb(str(tmp_path / "dedup.duckdb"))
+    yield conn
+    conn.close()
+
+
+def _record(conn, url, text, tag_result, canonical_url=None, now=SEEN):
+    record_fingerprint(
+        conn,
+        url=url,
+        fingerprint=simhash(text),
+        config_key="k",
+        tag_result=tag_result,
+        canonical_url=canonical_url,
+        now=now,
+    )
+
+
+def _lookup(conn, url, text, now=SEEN):
+    return find_near_duplicate(
+        conn, url=url, fingerprint=simhash(text), config_key="k", max_distance=3, window=WINDOW, now=now
+    )
+
+
+def test_canonical_item_does_not_match_its_own_copy(conn):
+    _record(conn, "a", TITLE, {"artist": "A"})
+    copy = _lookup(conn, "b", TITLE + "!")
+    assert copy is not None and copy.canonical_url == "a"
+    _record(conn, "b", TITLE + "!", copy.tag_result, canonical_url="a")
+
+    assert _lookup(conn, "a", TITLE) is None
+    assert find_recorded_duplicate(conn, url="a", fingerprint=simhash(TITLE), config_key="k") is None
+    recorded = find_recorded_duplicate(conn, url="b", fingerprint=simhash(TITLE + "!"), config_key="k")
+    assert recorded is not None and recorded.canonical_url == "a"
+
+
+def test_window_counts_from_first_sighting(conn):
+    _record(conn, "a", TITLE, {})
+    _record(conn, "a", TITLE, {}, now=SEEN + WINDOW)
+    assert _lookup(conn, "b", TITLE, now=SEEN + WINDOW + timedelta(hours=1)) is None
+
+
+def test_retagged_fingerprints_serve_new_tags(conn):
+    _record(conn, "a", TITLE, {"artist": "Old"})
+    _record(conn, "b", TITLE, {"artist": "Old"}, canonical_url="a")
+    update_fingerprint_tags(conn, url="a", tag_result={"artist": "New"})
+    assert _lookup(conn, "c", TITLE).tag_result == {"artist": "New"}
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    with StubServer() as stub:
+        monkeypatch.setenv("INGEST_GRAPH_API_BASE", stub.base_url)
+        monkeypatch.setenv("INGEST_DUCKDB_PATH", str(tmp_path / "ingest.duckdb"))
+        monkeypatch.setenv("INGEST_RSS_PARSE_EXECUTOR", "thread")
+        get_settings.cache_clear()
+        from ingest.main import app
+
+        with TestClient(app) as client:
+            yield client, stub
+    get_settings.cache_clear()
+
+
+def _ingest(client, url, artists):
+    response = client.post("/ingest/rss", json={"urls": [url], "artists": artists})
+    assert response.status_code == 200
+    return response.json()["feeds"][0]
+
+
+def test_repolled_canonical_item_is_not_its_copys_duplicate(service):
+    client, stub = service
+    original = stub.add_feed("wire", make_rss_xml("wire", [TITLE]))
+    syndicated = stub.add_feed("mirror", make_rss_xml("mirror", [TITLE]))
+
+    first = _ingest(client, original, ["Taylor Swift"])
+    copy = _ingest(client, syndicated, ["Taylor Swift"])
+    assert copy["duplicates"] == 1
+    assert copy["tagged"][0]["duplicate_of"] == first["tagged"][0]["news_item_id"]
+
+    repoll = _ingest(client, original, ["Taylor Swift"])
+    assert repoll["duplicates"] == 0
+    assert repoll["tagged"][0]["duplicate_of"] is None
+    copy_repoll = _ingest(client, syndicated, ["Taylor Swift"])
+    assert copy_repoll["tagged"][0]["duplicate_of"] == first["tagged"][0]["news_item_id"]
+
+
+def test_improve_tagging_updates_tags_reused_by_later_copies(service):
+    client, stub = service
+    original = stub.add_feed("wire", make_rss_xml("wire", [TITLE]))
+    _ingest(client, original, ["Drake"])
+
+    improved = client.post("/ingest/tagging/improve", json={"artists": ["Taylor Swift"]}).json()
+    assert improved["updated"] == 1
+
+    later = _ingest(client, stub.add_feed("mirror", make_rss_xml("mirror", [TITLE])), ["Drake"])
+    assert later["duplicates"] == 1
+    assert later["tagged"][0]["artist"] == "Taylor Swift"
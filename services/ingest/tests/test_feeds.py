@@ -0,0 +1,55 @@
+import asyncio
+
+import httpx
+
+from ingest.feeds import FeedParseError, build_parse_executor, fetch_feed
+
+GOOD_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Good</title>
+<item><title>First</title><link>https://example.com/1</link></item>
+</channel></rss>"""
+
+# Unclosed <item>/<channel> tags: feedparser flags this as bozo with a SAXParseException.
+MALFORMED_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Broken</title>
+<item><title>Kept anyway</title><link>https://example.com/2</link>
+"""
+
+
+def _fetch_all(executor, feeds):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=feeds[request.url.path])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [
+                await fetch_feed(client, f"https://feeds.test{path}", max_bytes=1 << 20, executor=executor)
+                for path in feeds
+            ]
+
+    return asyncio.run(run())
+
+
+def test_malformed_feed_parses_in_process_pool():
+    executor = build_parse_executor("process", 1)
+    try:
+        malformed, good = _fetch_all(executor, {"/broken": MALFORMED_FEED, "/good": GOOD_FEED})
+    finally:
+        executor.shutdown()
+
+    assert malformed.bozo_error
+    assert malformed.title == "Broken"
+    assert [entry["title"] for entry in malformed.entries] == ["Kept anyway"]
+    assert good.bozo_error is None
+    assert [entry["link"] for entry in good.entries] == ["https://example.com/1"]
+
+
+def test_executor_failure_is_reported_as_parse_error():
+    executor = build_parse_executor("thread", 1)
+    executor.shutdown()
+    try:
+        _fetch_all(executor, {"/good": GOOD_FEED})
+    except FeedParseError as exc:
+        assert exc.url == "https://feeds.test/good"
+    else:
+        raise AssertionError("expected FeedParseError")
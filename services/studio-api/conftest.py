@@ -0,0 +1 @@
+# The service runs as flat modules (`uvicorn main:app`); this file puts them on sys.path for tests.
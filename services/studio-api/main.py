@@ -1,29 +1,39 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
 from datetime import datetime
 import uuid
-from typing import List
+from typing import Optional
 
-app = FastAPI(title="Omnisonic Studio API")
+from sessions import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, Session, build_session_store
 
-class Session(BaseModel):
-    id: str
-    name: str
-    participants: int
-    created_at: datetime
+app = FastAPI(title="Omnisonic Studio API")
 
 class SessionCreate(BaseModel):
     name: str
 
-_sessions: List[Session] = []
+_sessions = build_session_store()
 
 @app.get("/healthz")
 def healthz():
     return {"ok": True}
 
 @app.get("/v1/sessions")
-def list_sessions():
-    return {"sessions": _sessions}
+def list_sessions(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    try:
+        sessions, next_cursor = _sessions.list_sessions(limit=limit, cursor=cursor)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"sessions": sessions, "next_cursor": next_cursor}
+
+@app.get("/v1/sessions/{session_id}")
+def get_session(session_id: str):
+    session = _sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"session": session}
 
 @app.post("/v1/sessions")
 def create_session(payload: SessionCreate):
@@ -33,5 +43,5 @@ def create_session(payload: SessionCreate):
         participants=0,
         created_at=datetime.utcnow()
     )
-    _sessions.append(new_sess)
+    _sessions.add(new_sess)
     return {"session": new_sess}
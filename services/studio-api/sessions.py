@@ -0,0 +1,186 @@
+import base64
+import bisect
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class Session(BaseModel):
+    id: str
+    name: str
+    participants: int
+    created_at: datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+SortKey = Tuple[datetime, str]
+
+
+def encode_cursor(key: SortKey) -> str:
+    raw = f"{key[0].isoformat()}|{key[1]}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    try:
+        created_at, session_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        parsed = datetime.fromisoformat(created_at)
+    except (ValueError, UnicodeError) as exc:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from exc
+    # Sessions are stored as naive UTC; hand-built cursors may carry an offset.
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed, session_id
+
+
+class SessionStore(ABC):
+    """Sessions ordered newest first by (created_at, id); pages resume after an opaque cursor."""
+
+    @abstractmethod
+    def add(self, session: Session) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Session]:
+        ...
+
+    @abstractmethod
+    def page(self, limit: int, after: Optional[SortKey] = None) -> List[Session]:
+        """Up to `limit` sessions older than `after` (or the newest ones)."""
+
+    def list_sessions(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Session], Optional[str]]:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        # One extra row tells us whether another page exists without a count query.
+        rows = self.page(limit + 1, decode_cursor(cursor) if cursor else None)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor((rows[-1].created_at, rows[-1].id))
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process store with an id index and a (created_at, id) index kept sorted."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_id: Dict[str, Session] = {}
+        self._order: List[SortKey] = []
+
+    def add(self, session: Session) -> None:
+        with self._lock:
+            self._by_id[session.id] = session
+            # New sessions are usually the newest, so this is an append in practice.
+            bisect.insort(self._order, (session.created_at, session.id))
+
+    def get(self, session_id: str) -> Optional[Session]:
+        return self._by_id.get(session_id)
+
+    def page(self, limit: int, after: Optional[SortKey] = None) -> List[Session]:
+        with self._lock:
+            end = bisect.bisect_left(self._order, after) if after else len(self._order)
+            keys = self._order[max(0, end - limit) : end]
+            return [self._by_id[session_id] for _created_at, session_id in reversed(keys)]
+
+
+class SqliteSessionStore(SessionStore):
+    """SQLite-backed store shared by every worker that points at the same file.
+
+    The SQL sticks to keyset pagination over an index on (created_at, id), so it ports to
+    Postgres unchanged apart from the parameter style.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                participants INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_created_at_id ON sessions (created_at, id)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads; FastAPI runs sync routes in a pool.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _timestamp(value: datetime) -> str:
+        # Fixed-width text keeps lexical order equal to time order.
+        return value.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+    @staticmethod
+    def _session(row: Tuple[str, str, int, str]) -> Session:
+        return Session(id=row[0], name=row[1], participants=row[2], created_at=datetime.fromisoformat(row[3]))
+
+    def add(self, session: Session) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO sessions (id, name, participants, created_at) VALUES (?, ?, ?, ?)",
+                (session.id, session.name, session.participants, self._timestamp(session.created_at)),
+            )
+
+    def get(self, session_id: str) -> Optional[Session]:
+        row = self._connection().execute(
+            "SELECT id, name, participants, created_at FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return self._session(row) if row else None
+
+    def page(self, limit: int, after: Optional[SortKey] = None) -> List[Session]:
+        if after is None:
+            rows = self._connection().execute(
+                """
+                SELECT id, name, participants, created_at FROM sessions
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+        else:
+            rows = self._connection().execute(
+                """
+                SELECT id, name, participants, created_at FROM sessions
+                WHERE (created_at, id) < (?, ?)
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+                """,
+                (self._timestamp(after[0]), after[1], limit),
+            ).fetchall()
+        return [self._session(row) for row in rows]
+
+
+def build_session_store() -> SessionStore:
+    backend = os.environ.get("STUDIO_SESSION_STORE", "memory")
+    if backend == "sqlite":
+        return SqliteSessionStore(os.environ.get("STUDIO_SESSION_DB", "data/studio-sessions.db"))
+    if backend != "memory":
+        raise ValueError(f"Unknown STUDIO_SESSION_STORE: {backend!r}")
+    return MemorySessionStore()
@@ -0,0 +1,58 @@
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+from sessions import InvalidCursor, MemorySessionStore, Session, SqliteSessionStore, decode_cursor
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionStore()
+    return SqliteSessionStore(str(tmp_path / "sessions.db"))
+
+
+def _fill(store, count):
+    start = datetime(2024, 1, 1)
+    sessions = []
+    for index in range(count):
+        # Every third session shares a timestamp with the one before it, so ties break on id.
+        created_at = start + timedelta(seconds=index - index // 3)
+        session = Session(id=f"s{index:04d}", name=f"Session {index}", participants=index % 5, created_at=created_at)
+        store.add(session)
+        sessions.append(session)
+    return sorted(sessions, key=lambda session: (session.created_at, session.id), reverse=True)
+
+
+def test_cursor_walk_returns_every_session_once_in_order(store):
+    expected = _fill(store, 23)
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = store.list_sessions(limit=5, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert [session.id for session in seen] == [session.id for session in expected]
+    assert store.get("s0007") == next(session for session in expected if session.id == "s0007")
+
+
+def test_last_full_page_has_no_next_cursor(store):
+    _fill(store, 10)
+    page, cursor = store.list_sessions(limit=10)
+    assert len(page) == 10 and cursor is None
+
+
+def test_offset_cursor_is_normalized_to_naive_utc(store):
+    expected = _fill(store, 6)
+    raw = f"{expected[1].created_at.isoformat()}+00:00|{expected[1].id}"
+    cursor = base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+    page, _ = store.list_sessions(limit=2, cursor=cursor)
+    assert [session.id for session in page] == [session.id for session in expected[2:4]]
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", base64.urlsafe_b64encode(b"no-separator").decode("ascii")])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)